@@ -4,6 +4,8 @@ Activity Agent - Specialized agent for attractions, tours, experiences, and sigh
 
 from typing import List, Tuple, Optional
 from .base_agent import BaseAgent
+from .budget import Deadline
+from .query_plan import QueryPlan
 
 
 class ActivityAgent(BaseAgent):
@@ -69,51 +71,67 @@ Format your responses with:
 - Alternative options for different preferences
 - For itineraries: time-based suggestions with travel considerations"""
     
-    def extract_activity_preferences(self, text: str) -> Tuple[Optional[str], List[str], str]:
-        """Extract activity preferences from user query"""
-        text_lower = text.lower()
+    # Keywords behind each activity type and budget level, checked in order
+    ACTIVITY_TYPE_KEYWORDS = {
+        "cultural": ["museum", "museums", "cultural", "history", "historical"],
+        "outdoor": ["outdoor", "nature", "hiking", "adventure", "trekking"],
+        "family": ["family", "kids", "children"],
+        "romantic": ["romantic", "couple", "date"],
+        "budget": ["budget", "cheap", "free", "affordable"],
+        "nightlife": ["nightlife", "night", "evening", "bars", "clubs"],
+    }
+    BUDGET_KEYWORDS = {
+        "budget": ["budget", "cheap", "free", "affordable", "low cost"],
+        "luxury": ["luxury", "expensive", "high-end", "premium"],
+    }
+    
+    def _get_preference_keywords(self) -> List[str]:
+        """Keywords used by extract_activity_preferences"""
+        groups = list(self.ACTIVITY_TYPE_KEYWORDS.values()) + list(self.BUDGET_KEYWORDS.values())
+        return [word for group in groups for word in group]
+    
+    def extract_activity_types(self, text: str) -> Tuple[List[str], str]:
+        """Extract activity types and budget level from user query"""
+        hits = self.keyword_hits(text)
         
         # Extract activity type preferences
-        activity_types = []
-        if any(word in text_lower for word in ["museum", "museums", "cultural", "history", "historical"]):
-            activity_types.append("cultural")
-        if any(word in text_lower for word in ["outdoor", "nature", "hiking", "adventure", "trekking"]):
-            activity_types.append("outdoor")
-        if any(word in text_lower for word in ["family", "kids", "children"]):
-            activity_types.append("family")
-        if any(word in text_lower for word in ["romantic", "couple", "date"]):
-            activity_types.append("romantic")
-        if any(word in text_lower for word in ["budget", "cheap", "free", "affordable"]):
-            activity_types.append("budget")
-        if any(word in text_lower for word in ["nightlife", "night", "evening", "bars", "clubs"]):
-            activity_types.append("nightlife")
+        activity_types = [
+            activity_type for activity_type, words in self.ACTIVITY_TYPE_KEYWORDS.items()
+            if any(word in hits for word in words)
+        ]
         
         # Extract budget preference
         budget = "medium"
-        if any(word in text_lower for word in ["budget", "cheap", "free", "affordable", "low cost"]):
-            budget = "budget"
-        elif any(word in text_lower for word in ["luxury", "expensive", "high-end", "premium"]):
-            budget = "luxury"
+        for level, words in self.BUDGET_KEYWORDS.items():
+            if any(word in hits for word in words):
+                budget = level
+                break
         
+        return activity_types, budget
+    
+    def extract_activity_preferences(self, text: str) -> Tuple[Optional[str], List[str], str]:
+        """Extract activity preferences from user query"""
+        activity_types, budget = self.extract_activity_types(text)
         return self.extract_destination(text), activity_types, budget
     
-    def process_query(self, query: str, collaboration_context: Optional[str] = None) -> dict:
+    def process_query(
+        self,
+        query: str,
+        collaboration_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        plan: Optional[QueryPlan] = None
+    ) -> dict:
         """Enhanced process query with activity-specific logic"""
         
-        # Check if query is relevant
-        if not self.is_relevant_query(query):
-            return {
-                "agent": self.agent_name,
-                "response": f"This query is not relevant to my expertise in {self.agent_name.lower()}.",
-                "sources": [],
-                "confidence": 0.0
-            }
-        
-        # Extract preferences
-        destination, activity_types, budget = self.extract_activity_preferences(query)
-        
-        # Retrieve context
-        context = self.retrieve_context(query)
+        if plan is None:
+            # Check if query is relevant
+            if not self.is_relevant_query(query):
+                return self._not_relevant_response()
+            
+            # Extract preferences
+            destination, activity_types, budget = self.extract_activity_preferences(query)
+        else:
+            destination, activity_types, budget = plan.destination, plan.activity_types, plan.activity_budget
         
         # Enhance query with preferences for better context
         enhanced_query = f"{query}"
@@ -124,5 +142,5 @@ Format your responses with:
         if budget != "medium":
             enhanced_query += f" with {budget} budget"
         
-        # Generate response
-        return self.generate_response(enhanced_query, context, collaboration_context)
+        # Retrieve context (with any speculative web search) and generate response
+        return self.retrieve_and_respond(query, enhanced_query, collaboration_context, deadline, plan)
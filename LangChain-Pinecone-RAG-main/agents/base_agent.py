@@ -3,9 +3,12 @@ Base Agent Class for Multi-Agent Travel System
 Provides common functionality for all specialized agents
 """
 
+import logging
 import os
 import re
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeout
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from abc import ABC, abstractmethod
 from dotenv import load_dotenv
 
@@ -13,8 +16,24 @@ from pinecone import Pinecone
 from langchain_pinecone import PineconeVectorStore
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_groq import ChatGroq
+from langchain_core.embeddings import Embeddings
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from .budget import Deadline, DeadlineExceeded
+from .keyword_matcher import KeywordMatcher
+from .query_plan import QueryPlan
+from .providers import ChatModel, PineconeIndex, VectorIndex, WebSearch
+from .web_cache import WebResultCache
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .speculation import RetrievalMissTracker, search_executor
+from .model_tiering import MODEL_TIERS, TierMetrics, TierPolicy, choose_tier, policy_for_agent
+from .semantic_cache import SemanticResponseCache, document_ids
+from .prompt_builder import PromptBuilder
+from .tokens import count_tokens
+from .rate_limit import OUTPUT_TOKEN_ESTIMATE, RateLimiter, call_with_retries, get_rate_limiter
+from .tracing import in_current_context, span
+from .structured_log import log_event
+
 try:
     from langchain_community.tools import DuckDuckGoSearchRun
 except Exception:
@@ -22,6 +41,55 @@ except Exception:
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+def usage_from_message(message: Any) -> Dict[str, int]:
+    """Prompt and completion token counts reported with an LLM message"""
+    metadata = getattr(message, "usage_metadata", None) or {}
+    return {
+        "input_tokens": int(metadata.get("input_tokens", 0)),
+        "output_tokens": int(metadata.get("output_tokens", 0)),
+    }
+
+
+def select_documents(
+    scored: List[Tuple[Any, float]],
+    score_threshold: float,
+    fallback_threshold: float = 0.3
+) -> Tuple[List[Any], str]:
+    """Documents to answer from and the tier that produced them
+    
+    Try the strict threshold first, then the lower fallback threshold, then
+    plain similarity; the tier is "strict", "fallback", "similarity" or "none".
+    """
+    docs = [doc for doc, rel in scored if rel >= score_threshold]
+    if docs:
+        return docs, "strict"
+    docs = [doc for doc, rel in scored if rel >= fallback_threshold]
+    if docs:
+        return docs, "fallback"
+    docs = [doc for doc, _ in scored]
+    return docs, "similarity" if docs else "none"
+
+
+# Appended to an agent's system prompt when earlier agents have answered
+COLLABORATION_PROMPT = """
+
+IMPORTANT: You are collaborating with other specialized agents. Consider the following context from other agents:
+{collaboration_context}
+
+When responding:
+- Build upon insights from other agents when relevant
+- Avoid duplicating information already provided by other agents
+- Focus on your specialized expertise while acknowledging other perspectives
+- If other agents have covered aspects of your expertise, provide additional depth or different angles
+- Ensure your response complements rather than conflicts with other agents' responses
+- For itinerary queries: provide specific, actionable recommendations that work well with other agents' suggestions
+- Include practical details like timing, location, and cultural context
+- Make your response specific to the destination mentioned in the query
+"""
+
 
 class BaseAgent(ABC):
     """Base class for all travel agents"""
@@ -35,6 +103,20 @@ class BaseAgent(ABC):
         groq_model: str = "llama-3.3-70b-versatile",
         retriever_k: int = 5,
         retriever_score_threshold: float = 0.5,
+        keyword_matcher: Optional[KeywordMatcher] = None,
+        response_cache: Optional[SemanticResponseCache] = None,
+        llm: Optional[ChatModel] = None,
+        embeddings: Optional[Embeddings] = None,
+        vector_index: Optional[VectorIndex] = None,
+        web_search_tool: Optional[WebSearch] = None,
+        small_groq_model: str = MODEL_TIERS["small"],
+        small_llm: Optional[ChatModel] = None,
+        tier_policy: Optional[TierPolicy] = None,
+        tier_metrics: Optional[TierMetrics] = None,
+        retrieval_tracker: Optional[RetrievalMissTracker] = None,
+        web_cache: Optional[WebResultCache] = None,
+        web_search_breaker: Optional[CircuitBreaker] = None,
+        rate_limiters: Optional[Dict[str, RateLimiter]] = None,
     ):
         self.agent_name = agent_name
         self.pinecone_api_key = pinecone_api_key or os.environ.get("PINECONE_API_KEY")
@@ -44,25 +126,95 @@ class BaseAgent(ABC):
         self.retriever_k = retriever_k
         self.retriever_score_threshold = retriever_score_threshold
         
-        # Initialize components
+        # Initialize components; injected providers (e.g. offline stand-ins) are used as given
+        self.llm = llm
+        self.embeddings = embeddings
+        self.vector_index = vector_index
+        self.web_search_tool = web_search_tool
+        self.small_groq_model = small_groq_model
+        self.small_llm = small_llm
         self._setup_components()
         
+        # Model tier per call: "small" for simple single-agent questions, "large" otherwise
+        self.tier_models = {"small": self.small_groq_model, "large": self.groq_model}
+        self.llms = {"small": self.small_llm, "large": self.llm}
+        self.tier_policy = tier_policy or policy_for_agent(agent_name.lower())
+        self.tier_metrics = tier_metrics
+        
+        # Recent retrieval misses drive speculative web search; the coordinator shares one tracker
+        self.retrieval_tracker = retrieval_tracker or RetrievalMissTracker()
+        
+        # Persistent web result cache injected by the coordinator (disabled if None)
+        self.web_cache = web_cache
+        
+        # Skips web search while it is failing or slow; the coordinator shares one breaker
+        self.web_search_breaker = web_search_breaker or CircuitBreaker("Web search")
+        
+        # Limiters by model name; models not listed use the process-wide limiter
+        self.rate_limiters = rate_limiters or {}
+        
         # Agent-specific keywords and capabilities
         self.keywords = self._get_keywords()
         self.system_prompt = self._get_system_prompt()
+        
+        # Shared matcher injected by the coordinator, or built on first use
+        self.keyword_matcher = keyword_matcher
+        
+        # Shared semantic response cache injected by the coordinator (disabled if None)
+        self.response_cache = response_cache
     
     def _setup_components(self):
-        """Initialize Pinecone, embeddings, and LLM"""
+        """Initialize Pinecone, embeddings, and LLM for any provider not injected"""
         try:
-            pc = Pinecone(api_key=self.pinecone_api_key)
-            index = pc.Index(self.pinecone_index_name)
-            embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-            self.vector_store = PineconeVectorStore(index=index, embedding=embeddings)
-            self.llm = ChatGroq(api_key=self.groq_api_key, model=self.groq_model, temperature=0.3)
-            self.web_search_tool = DuckDuckGoSearchRun() if DuckDuckGoSearchRun else None
+            if self.embeddings is None:
+                self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+            if self.vector_index is None:
+                pc = Pinecone(api_key=self.pinecone_api_key)
+                index = pc.Index(self.pinecone_index_name)
+                self.vector_index = PineconeIndex(PineconeVectorStore(index=index, embedding=self.embeddings), index)
+            if self.llm is None:
+                # Retries are handled by invoke_llm under the shared rate limiter
+                self.llm = ChatGroq(api_key=self.groq_api_key, model=self.groq_model, temperature=0.3, max_retries=0)
+            if self.small_llm is None:
+                self.small_llm = ChatGroq(api_key=self.groq_api_key, model=self.small_groq_model, temperature=0.3, max_retries=0)
+            if self.web_search_tool is None and DuckDuckGoSearchRun:
+                self.web_search_tool = DuckDuckGoSearchRun()
         except Exception as e:
             raise Exception(f"Failed to initialize {self.agent_name}: {e}")
     
+    def index_version(self) -> str:
+        """Identifier of the knowledge base contents, used to invalidate cached answers
+        
+        Combines the optional INDEX_VERSION setting (bump it after re-ingesting
+        changed documents) with the index's own version (the Pinecone vector count).
+        """
+        return f"{os.environ.get('INDEX_VERSION', '')}:{self.vector_index.version()}"
+    
+    def invoke_llm(
+        self,
+        messages: List[Any],
+        estimated_tokens: int,
+        deadline: Optional[Deadline] = None,
+        tier: str = "large",
+        **invoke_kwargs
+    ) -> Any:
+        """Call the tier's LLM under the rate limiter for its model, with retries"""
+        llm = self.llms[tier]
+        with span("llm", agent=self.agent_name, model=self.tier_models[tier], tier=tier) as llm_span:
+            message = call_with_retries(
+                lambda attempt_kwargs: llm.invoke(messages, **invoke_kwargs, **attempt_kwargs),
+                self.rate_limiters.get(self.tier_models[tier]) or get_rate_limiter(self.tier_models[tier]),
+                estimated_tokens,
+                deadline,
+                usage_fn=lambda message: sum(usage_from_message(message).values())
+            )
+            llm_span.set(**usage_from_message(message))
+            return message
+    
+    def select_tier(self, plan: Optional[QueryPlan], context: Optional[Dict[str, Any]]) -> str:
+        """Model tier for answering this request under the agent's tier policy"""
+        return choose_tier(self.tier_policy, plan, context.get("docs", []) if context else [])
+    
     @abstractmethod
     def _get_keywords(self) -> List[str]:
         """Return keywords this agent handles"""
@@ -73,6 +225,20 @@ class BaseAgent(ABC):
         """Return system prompt for this agent"""
         pass
     
+    def _get_preference_keywords(self) -> List[str]:
+        """Return extra keywords used by this agent's preference extractors"""
+        return []
+    
+    def get_vocabulary(self) -> List[str]:
+        """All keywords this agent looks for in a query"""
+        return self.keywords + self._get_preference_keywords()
+    
+    def keyword_hits(self, text: str) -> FrozenSet[str]:
+        """Keywords found in text (single cached pass of the keyword matcher)"""
+        if self.keyword_matcher is None:
+            self.keyword_matcher = KeywordMatcher(self.get_vocabulary())
+        return self.keyword_matcher.scan(text)
+    
     def sanitize_input(self, text: str) -> str:
         """Clean and limit input text"""
         cleaned = re.sub(r"\s+", " ", text.strip())
@@ -101,70 +267,106 @@ class BaseAgent(ABC):
     
     def is_relevant_query(self, query: str) -> bool:
         """Check if query is relevant to this agent"""
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in self.keywords)
+        hits = self.keyword_hits(query)
+        return any(keyword in hits for keyword in self.keywords)
     
-    def retrieve_context(self, query: str) -> Dict[str, Any]:
-        """Retrieve relevant context from vector store with fallback"""
-        clean_query = self.sanitize_input(query)
-        
-        # Try with strict threshold first
-        retriever = self.vector_store.as_retriever(
-            search_type="similarity_score_threshold",
-            search_kwargs={"k": self.retriever_k, "score_threshold": self.retriever_score_threshold}
-        )
-        
-        try:
-            docs = retriever.invoke(clean_query)
-        except Exception as e:
-            print(f"Error with strict threshold: {e}")
-            docs = []
+    def retrieve_context(self, query: str, query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Retrieve relevant context from vector store with fallback
         
-        # If no docs found, try with lower threshold
-        if not docs:
-            try:
-                retriever_fallback = self.vector_store.as_retriever(
-                    search_type="similarity_score_threshold",
-                    search_kwargs={"k": self.retriever_k, "score_threshold": 0.3}
-                )
-                docs = retriever_fallback.invoke(clean_query)
-            except Exception as e:
-                print(f"Error with fallback threshold: {e}")
-                docs = []
+        One vector search fetches the top k matches; the strict threshold, the
+        0.3 fallback threshold and plain similarity are then applied locally.
+        A precomputed query embedding (from the QueryPlan) skips re-embedding.
+        """
+        clean_query = self.sanitize_input(query)
         
-        # If still no docs, try simple similarity search
-        if not docs:
+        with span("retrieval", agent=self.agent_name) as retrieval_span:
             try:
-                retriever_simple = self.vector_store.as_retriever(
-                    search_type="similarity",
-                    search_kwargs={"k": self.retriever_k}
-                )
-                docs = retriever_simple.invoke(clean_query)
+                if query_embedding is None:
+                    with span("embedding", agent=self.agent_name):
+                        query_embedding = self.embeddings.embed_query(clean_query)
+                scored = self.vector_index.search(query_embedding, self.retriever_k)
             except Exception as e:
-                print(f"Error with simple search: {e}")
-                docs = []
+                log_event(logger, logging.WARNING, "vector_search_failed", agent=self.agent_name, error=str(e))
+                scored = []
+            
+            docs, retrieval_tier = select_documents(scored, self.retriever_score_threshold)
+            retrieval_span.set(retrieval_tier=retrieval_tier, documents=len(docs))
         
         sources: List[str] = []
-        for d in docs or []:
+        for d in docs:
             meta = getattr(d, "metadata", {}) or {}
             src = meta.get("source") or meta.get("file_path") or meta.get("path") or "unknown"
             if src not in sources:
                 sources.append(src)
         
-        return {"docs": docs or [], "sources": sources, "retrieved_from": "docs"}
+        return {"docs": docs, "sources": sources, "retrieved_from": "docs", "retrieval_tier": retrieval_tier}
     
     def web_search(self, query: str) -> str:
         """Perform web search for additional context with enhanced queries"""
         if not self.web_search_tool:
             return ""
         
-        try:
-            # Enhanced web search with more specific queries
-            enhanced_query = self._enhance_search_query(query)
-            return self.web_search_tool.run(enhanced_query)
-        except Exception as e:
-            print(f"Web search error: {e}")
+        with span("web_search", agent=self.agent_name) as search_span:
+            try:
+                # Enhanced web search with more specific queries
+                enhanced_query = self._enhance_search_query(query)
+                if self.web_cache is not None:
+                    cached = self.web_cache.get(enhanced_query)
+                    search_span.set(cache_hit=cached is not None)
+                    if cached is not None:
+                        return cached
+                result = self.web_search_breaker.call(self.web_search_tool.run, enhanced_query)
+                if result and self.web_cache is not None:
+                    self.web_cache.put(enhanced_query, result)
+                return result
+            except CircuitOpenError:
+                # Search is failing or too slow right now; answer from local knowledge only
+                search_span.set(circuit_open=True)
+                return ""
+            except Exception as e:
+                log_event(logger, logging.WARNING, "web_search_failed", agent=self.agent_name, error_type=type(e).__name__, error=str(e))
+                search_span.set(error=type(e).__name__)
+                return ""
+    
+    def start_speculative_search(self, query: str, plan: Optional[QueryPlan]) -> Optional[Future]:
+        """Start the web search now if retrieval is likely to come back short"""
+        if not self.web_search_tool or not self.retrieval_tracker.predict_miss(plan):
+            return None
+        self.retrieval_tracker.record_speculation()
+        return search_executor().submit(in_current_context(self.web_search), query)
+    
+    def resolve_web_search(
+        self,
+        query: str,
+        local_context: str,
+        speculative_search: Optional[Future] = None,
+        deadline: Optional[Deadline] = None
+    ) -> str:
+        """Web results when local context is limited, reusing a speculative search if one ran"""
+        limited = not local_context or len(local_context) < 500
+        self.retrieval_tracker.record_retrieval(limited)
+        if not limited:
+            if speculative_search is not None:
+                # Retrieval was enough; the search cannot be interrupted, so its result is dropped
+                speculative_search.cancel()
+                self.retrieval_tracker.record_speculation(used=False)
             return ""
+        
+        if deadline:
+            deadline.check("web search")
+        log_event(
+            logger, logging.INFO, "web_search_fallback", sampled=True,
+            agent=self.agent_name, local_context_chars=len(local_context), speculative=speculative_search is not None
+        )
+        if speculative_search is None:
+            return self.web_search(query)
+        
+        self.retrieval_tracker.record_speculation(used=True)
+        with span("web_search.wait", agent=self.agent_name, speculative=True):
+            try:
+                return speculative_search.result(timeout=deadline.remaining() if deadline else None)
+            except FuturesTimeout:
+                raise DeadlineExceeded("web search")
     
     def _enhance_search_query(self, query: str) -> str:
         """Enhance search query for better web search results"""
@@ -184,74 +386,109 @@ class BaseAgent(ABC):
         self, 
         query: str, 
         context: Optional[Dict[str, Any]] = None,
-        collaboration_context: Optional[str] = None
+        collaboration_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        tier: str = "large",
+        speculative_search: Optional[Future] = None
     ) -> Dict[str, Any]:
         """Generate response using LLM with enhanced collaboration support"""
         
-        # Build context
-        local_context = ""
-        sources = []
+        # Fit every prompt section to this model's token budgets
+        builder = PromptBuilder(self.tier_models[tier])
+        docs = context.get("docs", []) if context else []
+        sources = list(context.get("sources", [])) if context else []
+        collaboration_overhead = count_tokens(COLLABORATION_PROMPT.format(collaboration_context=""))
+        fitted_collaboration = builder.fit("collaboration", collaboration_context or "", collaboration_overhead)
+        local_context = builder.fit_documents("local_docs", (getattr(d, "page_content", "") for d in docs))
         web_context = ""
         
-        if context:
-            docs = context.get("docs", [])
-            local_context = "\n\n".join(getattr(d, "page_content", "") for d in docs)[:4000]
-            sources = context.get("sources", [])
+        # Reuse an earlier answer to an equivalent question over the same documents
+        doc_ids, query_vector = (), None
+        if deadline:
+            deadline.check("response cache")
+        if self.response_cache is not None:
+            cached = None
+            with span("response_cache", agent=self.agent_name) as cache_span:
+                try:
+                    doc_ids = document_ids(docs)
+                    query_vector = self.embeddings.embed_query(query)
+                    cached = self.response_cache.lookup(self.agent_name, doc_ids, collaboration_context, query_vector)
+                except Exception as e:
+                    log_event(logger, logging.WARNING, "response_cache_lookup_failed", agent=self.agent_name, error=str(e))
+                    query_vector = None
+                cache_span.set(hit=bool(cached))
+            if cached:
+                if speculative_search is not None:
+                    speculative_search.cancel()
+                cached["usage"] = {"input_tokens": 0, "output_tokens": 0}
+                cached["cached"] = True
+                return cached
         
         # Use web search if local context is limited
-        if not local_context or len(local_context) < 500:
-            print(f"🔍 Limited local context, using web search for {self.agent_name} agent...")
-            web_context = self.web_search(query)
-            if web_context:
-                sources.append("Web Search Results")
+        web_context = builder.fit("web", self.resolve_web_search(query, local_context, speculative_search, deadline))
+        if web_context:
+            sources.append("Web Search Results")
         
         # Enhanced system prompt for collaboration
-        enhanced_system_prompt = self.system_prompt
-        if collaboration_context:
-            enhanced_system_prompt += f"""
-
-IMPORTANT: You are collaborating with other specialized agents. Consider the following context from other agents:
-{collaboration_context}
-
-When responding:
-- Build upon insights from other agents when relevant
-- Avoid duplicating information already provided by other agents
-- Focus on your specialized expertise while acknowledging other perspectives
-- If other agents have covered aspects of your expertise, provide additional depth or different angles
-- Ensure your response complements rather than conflicts with other agents' responses
-- For itinerary queries: provide specific, actionable recommendations that work well with other agents' suggestions
-- Include practical details like timing, location, and cultural context
-- Make your response specific to the destination mentioned in the query
-"""
+        enhanced_system_prompt = builder.fit("system", self.system_prompt)
+        if fitted_collaboration:
+            enhanced_system_prompt += COLLABORATION_PROMPT.format(collaboration_context=fitted_collaboration)
         
         # Add fallback guidance when no local context is available
         if not local_context:
-            enhanced_system_prompt += f"""
+            fallback_note = f"""
 
 NOTE: No specific local knowledge was found in the knowledge base. Please provide general expert advice based on your specialized knowledge in {self.agent_name.lower()}. 
 Use your training knowledge to provide helpful, accurate information while being clear that this is general guidance.
 """
+            builder.record("system", fallback_note)
+            enhanced_system_prompt += fallback_note
         
         # Build prompt
         prompt_parts = [f"User query: {query}"]
+        builder.record("query", prompt_parts[0])
         
         if local_context:
             prompt_parts.append(f"Local knowledge:\n{local_context}")
         
         if web_context:
-            prompt_parts.append(f"Web search results:\n{web_context[:2000]}")
+            prompt_parts.append(f"Web search results:\n{web_context}")
         
         if not local_context and not web_context:
             prompt_parts.append("No specific knowledge available - provide general expert guidance based on your training")
         
         prompt = "\n\n".join(prompt_parts)
+        if not builder.fits():
+            # Uncut sections (system prompt, query) can still overrun the context window
+            log_event(
+                logger, logging.WARNING, "prompt_over_budget", agent=self.agent_name, model=self.tier_models[tier],
+                prompt_tokens=builder.total_tokens, context_window=builder.budget.context_window
+            )
         
-        # Generate response
+        # Generate response, bounding the LLM call by whatever is left of the deadline
+        if deadline:
+            deadline.check("LLM call")
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        llm_succeeded = False
         try:
             system_msg = SystemMessage(content=enhanced_system_prompt)
             human_msg = HumanMessage(content=prompt)
-            response = self.llm.invoke([system_msg, human_msg]).content
+            started = time.perf_counter()
+            message = self.invoke_llm(
+                [system_msg, human_msg], builder.total_tokens + OUTPUT_TOKEN_ESTIMATE, deadline, tier
+            )
+            response = message.content
+            usage = usage_from_message(message)
+            llm_succeeded = True
+            if self.tier_metrics is not None:
+                self.tier_metrics.record(tier, self.tier_models[tier], time.perf_counter() - started, usage)
+        except DeadlineExceeded:
+            raise
         except Exception as e:
+            # The provider's own timeout fires when the deadline runs out mid-call
+            if deadline and deadline.expired:
+                raise DeadlineExceeded(f"Deadline of {deadline.seconds:.1f}s exceeded during LLM call") from e
+            log_event(logger, logging.WARNING, "llm_call_failed", exc_info=True, agent=self.agent_name, model=self.tier_models[tier])
             # Fallback response if LLM fails
             response = self._get_fallback_response(query)
         
@@ -261,13 +498,25 @@ Use your training knowledge to provide helpful, accurate information while being
             confidence += 0.2  # Higher confidence with local knowledge
         if collaboration_context:
             confidence += 0.1  # Slight boost for collaboration context
+        if not llm_succeeded:
+            confidence = 0.4  # A canned answer, ranked like a timed-out agent's
         
-        return {
+        result = {
             "agent": self.agent_name,
             "response": response.strip(),
             "sources": sources,
-            "confidence": min(confidence, 0.95)  # Cap at 95%
+            "confidence": min(confidence, 0.95),  # Cap at 95%
+            "fallback": not llm_succeeded,
+            "usage": usage,
+            "model": self.tier_models[tier],
+            "prompt_tokens": dict(builder.token_counts),
+            "model_tier": tier
         }
+        
+        # Only real LLM answers are cached, never fallbacks
+        if query_vector is not None and llm_succeeded:
+            self.response_cache.store(self.agent_name, doc_ids, collaboration_context, query_vector, result)
+        return result
     
     def _get_fallback_response(self, query: str) -> str:
         """Provide fallback response when LLM fails"""
@@ -285,21 +534,54 @@ Use your training knowledge to provide helpful, accurate information while being
     def process_query(
         self, 
         query: str, 
-        collaboration_context: Optional[str] = None
+        collaboration_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        plan: Optional[QueryPlan] = None
     ) -> Dict[str, Any]:
-        """Main method to process a query"""
+        """Main method to process a query
+        
+        With a QueryPlan the coordinator has already selected this agent and
+        extracted everything needed, so the relevance check is skipped.
+        """
         
         # Check if query is relevant
-        if not self.is_relevant_query(query):
-            return {
-                "agent": self.agent_name,
-                "response": f"This query is not relevant to my expertise in {self.agent_name.lower()}.",
-                "sources": [],
-                "confidence": 0.0
-            }
+        if plan is None and not self.is_relevant_query(query):
+            return self._not_relevant_response()
+        
+        return self.retrieve_and_respond(query, query, collaboration_context, deadline, plan)
+    
+    def retrieve_and_respond(
+        self,
+        query: str,
+        enhanced_query: str,
+        collaboration_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        plan: Optional[QueryPlan] = None
+    ) -> Dict[str, Any]:
+        """Retrieve context for the query and answer the preference-enhanced query
+        
+        A web search that will probably be needed is started before retrieval
+        so the two run concurrently.
+        """
+        # A worker that picks this up after its deadline (queued, or abandoned) stops here
+        if deadline:
+            deadline.check("retrieval")
+        speculative_search = self.start_speculative_search(enhanced_query, plan)
         
         # Retrieve context
-        context = self.retrieve_context(query)
+        context = self.retrieve_context(query, plan.query_embedding if plan else None)
         
         # Generate response
-        return self.generate_response(query, context, collaboration_context)
+        return self.generate_response(
+            enhanced_query, context, collaboration_context, deadline,
+            self.select_tier(plan, context), speculative_search
+        )
+    
+    def _not_relevant_response(self) -> Dict[str, Any]:
+        """Response for a query outside this agent's expertise"""
+        return {
+            "agent": self.agent_name,
+            "response": f"This query is not relevant to my expertise in {self.agent_name.lower()}.",
+            "sources": [],
+            "confidence": 0.0
+        }
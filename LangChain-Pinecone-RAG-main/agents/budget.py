@@ -0,0 +1,62 @@
+"""
+Latency Budget - Per-request time budgets and cooperative cancellation for agents
+"""
+
+import threading
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised inside an agent when its deadline has passed or it was cancelled"""
+
+
+class Deadline:
+    """Deadline for a single agent run, with a cancellation flag the agent checks between stages"""
+
+    def __init__(self, seconds: float):
+        self.seconds = max(seconds, 0.0)
+        self.expires_at = time.monotonic() + self.seconds
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (0 when expired or cancelled)"""
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self._cancelled.is_set() or time.monotonic() >= self.expires_at
+
+    def cancel(self):
+        """Ask the agent to stop at its next checkpoint"""
+        self._cancelled.set()
+
+    def check(self, stage: str = ""):
+        """Raise DeadlineExceeded if the agent should stop before starting `stage`"""
+        if self.expired:
+            where = f" before {stage}" if stage else ""
+            raise DeadlineExceeded(f"Deadline of {self.seconds:.1f}s exceeded{where}")
+
+
+class LatencyBudget:
+    """Splits a per-request latency budget across agents that run one after another.
+
+    Each agent gets an equal share of whatever is left, so time an early agent
+    does not use carries over to the agents after it.
+    """
+
+    def __init__(self, total_seconds: float, agent_count: int):
+        self.total_seconds = total_seconds
+        self.started_at = time.monotonic()
+        self.agents_remaining = max(agent_count, 1)
+
+    def remaining(self) -> float:
+        """Seconds left in the whole request budget"""
+        return max(0.0, self.total_seconds - (time.monotonic() - self.started_at))
+
+    def next_deadline(self) -> Deadline:
+        """Create the deadline for the next agent in line"""
+        share = self.remaining() / self.agents_remaining
+        self.agents_remaining = max(self.agents_remaining - 1, 1)
+        return Deadline(share)
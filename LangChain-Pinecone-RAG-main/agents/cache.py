@@ -0,0 +1,66 @@
+"""
+Caching Utilities - Shared query normalization and a thread-safe LRU cache with hit-rate stats
+"""
+
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def normalize_query(text: str) -> str:
+    """Canonical cache key for a query.
+
+    Unicode-normalizes, lowercases, collapses whitespace and trims surrounding
+    punctuation, so "Plan a day in Hanoi?" and "plan a day  in hanoi" share a key.
+    Inner punctuation is kept because keyword matching relies on word boundaries.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = " ".join(text.lower().split())
+    return text.strip(" .,!?;:\"'")
+
+
+class LRUCache:
+    """Bounded least-recently-used cache that counts hits and misses"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts, hit rate and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,130 @@
+"""
+Circuit Breaker - Stop calling a failing or slow dependency and probe for its recovery
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+from .structured_log import log_event
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the dependency while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker driven by failure and slow-call rates.
+
+    While closed, the outcomes of the last `window` calls are tracked; once at
+    least `min_calls` are recorded and the share of failures or of calls slower
+    than `slow_call_seconds` reaches its threshold, the circuit opens. Open
+    circuits reject calls immediately for `open_seconds`, then half-open: up to
+    `half_open_max_calls` probe calls go through, and the first probe outcome
+    closes the circuit again (success) or re-opens it (failure or slow).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 8.0,
+        slow_call_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _trip(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+        log_event(logger, logging.WARNING, "circuit_opened", service=self.name, open_s=self.open_seconds)
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes = 0
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            self.calls += 1
+            return True
+
+    def _record(self, failed: bool, latency: float):
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            if failed:
+                self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self._probes -= 1
+                if failed or slow:
+                    self._trip()
+                else:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state == self.OPEN:
+                return
+            self._outcomes.append((failed, slow))
+            if len(self._outcomes) >= self.min_calls:
+                failure_rate = sum(f for f, _ in self._outcomes) / len(self._outcomes)
+                slow_rate = sum(s for _, s in self._outcomes) / len(self._outcomes)
+                if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                    self._trip()
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call fn through the breaker; raises CircuitOpenError while open"""
+        if not self._allow():
+            raise CircuitOpenError(f"{self.name} circuit is {self.state}")
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record(True, time.monotonic() - started)
+            raise
+        self._record(False, time.monotonic() - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+            }
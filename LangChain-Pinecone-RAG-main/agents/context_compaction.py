@@ -0,0 +1,124 @@
+"""
+Context Compaction - Extractive summary of earlier agents' answers under a token budget
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Set, Tuple
+
+from .tokens import count_tokens
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "for", "from",
+    "has", "have", "if", "in", "is", "it", "its", "may", "of", "on", "or", "so", "such",
+    "that", "the", "their", "there", "these", "this", "to", "was", "we", "were", "will",
+    "with", "you", "your", "also", "more", "most", "some", "very", "when", "which", "while",
+}
+
+# Only confident answers are shared with later agents
+MIN_CONFIDENCE = 0.5
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split an agent answer into plain sentences, dropping Markdown markup and fragments"""
+    sentences = []
+    for line in text.splitlines():
+        line = re.sub(r"^\s*(?:#+|[-*•]|\d+[.)])\s*", "", line)
+        line = line.replace("**", "").replace("__", "").strip()
+        for sentence in re.split(r"(?<=[.!?])\s+", line):
+            sentence = sentence.strip()
+            if len(sentence.split()) >= 4:
+                sentences.append(sentence)
+    return sentences
+
+
+def _terms(sentence: str) -> Set[str]:
+    return {t for t in re.findall(r"[a-z0-9']+", sentence.lower()) if t not in STOPWORDS and len(t) > 2}
+
+
+def _specificity(sentence: str) -> float:
+    """Bonus for concrete facts: numbers, times and proper nouns"""
+    numbers = len(re.findall(r"\d", sentence))
+    proper_nouns = len(re.findall(r"(?<!^)(?<![.!?]\s)\b[A-Z][a-z]+", sentence))
+    return 0.5 * min(numbers, 4) + 0.3 * min(proper_nouns, 5)
+
+
+def compact_collaboration_context(
+    responses: List[Dict[str, Any]],
+    budget_tokens: int
+) -> Tuple[str, int]:
+    """Pick the most informative sentences from earlier agents within `budget_tokens`.
+
+    Sentences are scored by the rarity of their content words across all
+    candidate sentences plus a specificity bonus, then chosen greedily by score
+    per token. Words already covered by a chosen sentence stop counting, so
+    near-duplicates from different agents are not both kept. Chosen sentences
+    are emitted whole, in their original order. Returns the context text and
+    its token count.
+    """
+    candidates = []
+    for response in responses:
+        if response.get("confidence", 0.0) <= MIN_CONFIDENCE:
+            continue
+        for sentence in split_sentences(response["response"]):
+            candidates.append({
+                "agent": response["agent"],
+                "sentence": sentence,
+                "terms": _terms(sentence),
+                "tokens": count_tokens(sentence) + 1,
+                "bonus": _specificity(sentence),
+            })
+    if not candidates:
+        return "", 0
+
+    document_frequency: Dict[str, int] = {}
+    for candidate in candidates:
+        for term in candidate["terms"]:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+    idf = {term: math.log(1 + len(candidates) / df) for term, df in document_frequency.items()}
+
+    header = "Previous agent insights:"
+    remaining = budget_tokens - count_tokens(header)
+    covered: Set[str] = set()
+    chosen_ids: Set[int] = set()
+    while True:
+        best, best_ratio = None, 0.0
+        for index, candidate in enumerate(candidates):
+            if index in chosen_ids or candidate["tokens"] > remaining:
+                continue
+            gain = sum(idf[t] for t in candidate["terms"] - covered) + candidate["bonus"]
+            ratio = gain / candidate["tokens"]
+            if ratio > best_ratio:
+                best, best_ratio = index, ratio
+        if best is None:
+            break
+        chosen_ids.add(best)
+        covered |= candidates[best]["terms"]
+        remaining -= candidates[best]["tokens"]
+    chosen = [candidates[index] for index in sorted(chosen_ids)]
+
+    if not chosen:
+        return "", 0
+
+    # Group by agent, keeping each agent's sentences in their original order
+    lines = [header]
+    for agent in dict.fromkeys(c["agent"] for c in candidates):
+        picked = [c for c in chosen if c["agent"] == agent]
+        if picked:
+            lines.append(f"- {agent}: " + " ".join(c["sentence"] for c in picked))
+    text = "\n".join(lines)
+    return text, count_tokens(text)
+
+
+def truncation_baseline(responses: List[Dict[str, Any]]) -> str:
+    """The context the coordinator used to build by truncating each earlier answer.
+
+    Kept only to measure how many prompt tokens compaction saves.
+    """
+    cumulative = ""
+    insights = "\n\nPrevious agent insights:\n"
+    for response in responses:
+        if response.get("confidence", 0.0) > MIN_CONFIDENCE:
+            cumulative += f"\n{response['agent']} Agent: {response['response'][:200]}...\n"
+            insights += f"- {response['agent']}: {response['response'][:150]}...\n"
+    return cumulative + insights
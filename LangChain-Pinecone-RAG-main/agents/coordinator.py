@@ -2,19 +2,133 @@
 Agent Coordinator - Orchestrates multi-agent collaboration and query routing
 """
 
+import logging
+import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from typing import List, Dict, Any, Optional, Tuple
 from .base_agent import BaseAgent
+from .budget import Deadline, DeadlineExceeded, LatencyBudget
 from .culture_agent import CultureAgent
 from .activity_agent import ActivityAgent
 from .food_agent import FoodAgent
 from .language_agent import LanguageAgent
+from .keyword_matcher import KeywordMatcher
+from .intent_router import DEFAULT_THRESHOLD, EmbeddingRouter
+from .query_plan import QueryPlan
+from .fused_itinerary import SECTION_AGENTS, run_fused_itinerary
+from .context_compaction import compact_collaboration_context, truncation_baseline
+from .tokens import count_tokens
+from .cache import LRUCache, normalize_query
+from .semantic_cache import SemanticResponseCache
+from .single_flight import SingleFlight
+from .model_tiering import TierMetrics, TierPolicy
+from .speculation import RetrievalMissTracker
+from .circuit_breaker import CircuitBreaker
+from .web_cache import DEFAULT_PATH as WEB_CACHE_PATH, WebResultCache
+from .tracing import in_current_context, span, start_trace
+from .metrics import AgentMetrics, serve_metrics
+from .profiling import DEFAULT_DIR as PROFILE_DIR, PROFILE_MODES, RequestProfiler
+from .structured_log import configure_logging, log_event, request_context
+from .usage import cost_usd, summarize_usage, usage_from_responses
+
+logger = logging.getLogger(__name__)
+
+# Weighted routing keywords per agent, used by analyze_query
+KEYWORD_WEIGHTS = {
+    "culture": {
+        "culture": 2, "cultural": 2, "tradition": 2, "customs": 2, "etiquette": 2,
+        "festival": 2, "ceremony": 2, "heritage": 2, "wedding": 1, "ritual": 1,
+        "local": 1, "regional": 1, "taboo": 1, "sacred": 1, "religious": 1
+    },
+    "activity": {
+        "activities": 2, "attractions": 2, "things to do": 2, "sightseeing": 2,
+        "tour": 2, "visit": 2, "explore": 2, "museums": 2, "temples": 2,
+        "parks": 2, "hiking": 2, "adventure": 2, "itinerary": 3, "plan": 2,
+        "schedule": 2, "day": 1, "morning": 1, "afternoon": 1, "evening": 1
+    },
+    "food": {
+        "food": 2, "cuisine": 2, "restaurant": 2, "dining": 2, "eat": 2,
+        "dish": 2, "street food": 2, "vegetarian": 1, "vegan": 1, "halal": 1,
+        "kosher": 1, "allergies": 1, "menu": 1, "breakfast": 1, "lunch": 1,
+        "dinner": 1, "snacks": 1, "drinks": 1
+    },
+    "language": {
+        "language": 2, "translate": 2, "phrases": 2, "speak": 2, "communication": 2,
+        "pronunciation": 2, "greetings": 2, "directions": 2, "help": 2,
+        "emergency": 2, "polite": 1, "formal": 1, "informal": 1
+    }
+}
+
+# Phrases that mark an itinerary/planning query
+ITINERARY_KEYWORDS = [
+    "itinerary", "plan", "planning", "schedule", "day", "trip", "visit",
+    "spend a day", "what to do", "things to do", "recommendations",
+    "guide", "tour", "explore", "experience", "activities", "attractions",
+    "plan a day", "day in", "travel to", "going to", "trip to",
+    "vacation", "holiday", "sightseeing", "must see", "top places",
+    "best places", "where to go", "what to see", "places to visit"
+]
+
+# Destinations and words that mark a general travel query
+TRAVEL_INDICATORS = [
+    "vietnam", "ho chi minh", "hanoi", "hoi an", "saigon",
+    "visit", "travel", "trip", "vacation", "holiday", "destination"
+]
+
+# Fallback inference when no routing keyword matched, checked in order
+INFERENCE_RULES = [
+    (["visit", "travel", "trip", "destination"], ["culture", "activity"]),  # General travel queries
+    (["recommend", "suggest", "best"], ["culture", "activity", "food"]),  # Recommendation queries
+    (["plan", "itinerary", "schedule"], ["culture", "activity", "food", "language"]),  # Planning queries
+]
 
 
 class AgentCoordinator:
     """Coordinates multiple specialized agents for comprehensive travel assistance"""
     
-    def __init__(self, **kwargs):
+    def __init__(
+        self,
+        latency_budget: Optional[float] = None,
+        routing_mode: Optional[str] = None,
+        fused_itinerary: Optional[bool] = None,
+        tier_policies: Optional[Dict[str, TierPolicy]] = None,
+        configure_logs: bool = True,
+        metrics_port: Optional[int] = None,
+        **kwargs
+    ):
+        # JSON-lines logs on stderr, written by a background thread (configured once per process)
+        if configure_logs:
+            configure_logging(
+                level=os.environ.get("LOG_LEVEL", "INFO"),
+                fmt=os.environ.get("LOG_FORMAT", "json"),
+                sample_rate=float(os.environ.get("LOG_SAMPLE_RATE", "1.0")),
+                path=os.environ.get("LOG_FILE")
+            )
+        # Latency and tokens per model tier, shared by all agents
+        self.tier_metrics = TierMetrics()
+        kwargs.setdefault("tier_metrics", self.tier_metrics)
+        # Retrieval outcomes across all agents decide when to start web search early
+        self.retrieval_tracker = RetrievalMissTracker()
+        kwargs.setdefault("retrieval_tracker", self.retrieval_tracker)
+        # Web results persisted on disk and shared by every agent and session
+        self.web_cache = kwargs.get("web_cache")
+        web_cache_size = int(os.environ.get("WEB_CACHE_SIZE", "5000"))
+        if "web_cache" not in kwargs and web_cache_size > 0:
+            self.web_cache = WebResultCache(
+                path=os.environ.get("WEB_CACHE_PATH", WEB_CACHE_PATH),
+                ttl_seconds=float(os.environ.get("WEB_CACHE_TTL", "86400")),
+                max_entries=web_cache_size
+            )
+        kwargs.setdefault("web_cache", self.web_cache)
+        # One breaker for web search, so an outage trips it for every agent at once
+        self.web_search_breaker = CircuitBreaker(
+            "Web search",
+            slow_call_seconds=float(os.environ.get("WEB_SEARCH_SLOW_SECONDS", "8")),
+            open_seconds=float(os.environ.get("WEB_SEARCH_OPEN_SECONDS", "30"))
+        )
+        kwargs.setdefault("web_search_breaker", self.web_search_breaker)
         self.agents = {
             "culture": CultureAgent(**kwargs),
             "activity": ActivityAgent(**kwargs),
@@ -22,6 +136,10 @@ class AgentCoordinator:
             "language": LanguageAgent(**kwargs)
         }
         
+        # Per-agent overrides of the default model tier policies
+        for agent_name, policy in (tier_policies or {}).items():
+            self.agents[agent_name].tier_policy = policy
+        
         # Keywords for determining which agents to involve
         self.agent_keywords = {
             "culture": [
@@ -41,44 +159,105 @@ class AgentCoordinator:
                 "greetings", "directions", "help", "emergency", "polite"
             ]
         }
+        
+        # One keyword matcher for routing, relevance checks and preference extraction
+        vocabulary = list(ITINERARY_KEYWORDS) + list(TRAVEL_INDICATORS)
+        for weights in KEYWORD_WEIGHTS.values():
+            vocabulary.extend(weights)
+        for words, _ in INFERENCE_RULES:
+            vocabulary.extend(words)
+        for keywords in self.agent_keywords.values():
+            vocabulary.extend(keywords)
+        for agent in self.agents.values():
+            vocabulary.extend(agent.get_vocabulary())
+        self.keyword_matcher = KeywordMatcher(vocabulary)
+        for agent in self.agents.values():
+            agent.keyword_matcher = self.keyword_matcher
+        
+        # Query embeddings are computed once per request and shared by routing and retrieval
+        self.embeddings = self.agents["culture"].embeddings
+        
+        # "keyword" routing (default) or "embedding" routing against intent centroids
+        self.routing_mode = routing_mode or os.environ.get("ROUTING_MODE", "keyword")
+        self.intent_router = None
+        if self.routing_mode == "embedding":
+            self.intent_router = EmbeddingRouter(
+                self.embeddings,
+                threshold=float(os.environ.get("ROUTER_THRESHOLD", DEFAULT_THRESHOLD))
+            )
+        
+        # Routing decisions memoized per normalized query
+        self.routing_cache = LRUCache(maxsize=int(os.environ.get("ROUTING_CACHE_SIZE", "1024")))
+        
+        # Agent answers reused for near-identical questions over the same documents
+        self.response_cache = None
+        response_cache_size = int(os.environ.get("RESPONSE_CACHE_SIZE", "512"))
+        if response_cache_size > 0:
+            self.response_cache = SemanticResponseCache(
+                similarity_threshold=float(os.environ.get("RESPONSE_CACHE_THRESHOLD", "0.95")),
+                ttl_seconds=float(os.environ.get("RESPONSE_CACHE_TTL", "3600")),
+                max_entries=response_cache_size,
+                version_fn=self.agents["culture"].index_version
+            )
+            for agent in self.agents.values():
+                agent.response_cache = self.response_cache
+        
+        # Per-request latency budget (seconds), split across the agents that run
+        self.latency_budget = latency_budget or float(os.environ.get("AGENT_LATENCY_BUDGET", "45"))
+        # Write itineraries with one structured LLM call instead of one call per agent
+        if fused_itinerary is None:
+            fused_itinerary = os.environ.get("FUSED_ITINERARY", "").lower() in ("1", "true", "yes")
+        self.fused_itinerary = fused_itinerary
+        # Share of the request budget the fused call may use; the rest is kept for the per-agent fallback
+        self.fused_share = float(os.environ.get("FUSED_ITINERARY_SHARE", "0.5"))
+        
+        # Token budget for the digest of earlier answers passed to later agents
+        self.collaboration_token_budget = int(os.environ.get("COLLABORATION_TOKEN_BUDGET", "180"))
+        
+        # Identical requests already being answered are joined rather than repeated
+        self._in_flight = SingleFlight()
+        
+        # Agents run on worker threads so a slow one can be abandoned at its deadline.
+        # An abandoned agent keeps its worker until its next deadline checkpoint, so
+        # the default leaves room for every agent of LLM_MAX_CONCURRENCY requests at once
+        default_workers = int(os.environ.get("LLM_MAX_CONCURRENCY", "4")) * len(self.agents)
+        self.agent_workers = int(os.environ.get("AGENT_WORKERS", default_workers))
+        self._executor = ThreadPoolExecutor(max_workers=self.agent_workers, thread_name_prefix="agent")
+        
+        # Directory for per-request Chrome trace files (disabled if unset)
+        self.trace_dir = os.environ.get("TRACE_DIR")
+        
+        # Prometheus-style metrics, served on METRICS_PORT (0 disables) and/or written to METRICS_FILE
+        self.metrics = AgentMetrics()
+        self.metrics_file = os.environ.get("METRICS_FILE")
+        self.metrics_server = None
+        if metrics_port is None:
+            metrics_port = int(os.environ.get("METRICS_PORT") or 0)
+        if metrics_port:
+            try:
+                self.metrics_server = serve_metrics(self.metrics, metrics_port)
+                log_event(logger, logging.INFO, "metrics_server_started", url=f"http://127.0.0.1:{metrics_port}/metrics")
+            except OSError as e:
+                log_event(logger, logging.WARNING, "metrics_server_failed", error=str(e))
+        
+        # Profile every request ("cprofile" or "sample"); the app can also ask per request
+        self.profile_mode = os.environ.get("PROFILE_REQUESTS", "").lower() or None
+        if self.profile_mode not in (None,) + PROFILE_MODES:
+            log_event(logger, logging.WARNING, "unknown_profile_mode", mode=self.profile_mode)
+            self.profile_mode = None
+        self.profile_dir = os.environ.get("PROFILE_DIR", PROFILE_DIR)
+        self.profile_interval = float(os.environ.get("PROFILE_INTERVAL", "0.005"))
     
     def analyze_query(self, query: str) -> Dict[str, float]:
         """Analyze query to determine which agents should be involved"""
-        query_lower = query.lower()
+        hits = self.keyword_matcher.scan(query)
         agent_scores = {}
         
-        # Enhanced keyword matching with weights
-        keyword_weights = {
-            "culture": {
-                "culture": 2, "cultural": 2, "tradition": 2, "customs": 2, "etiquette": 2,
-                "festival": 2, "ceremony": 2, "heritage": 2, "wedding": 1, "ritual": 1,
-                "local": 1, "regional": 1, "taboo": 1, "sacred": 1, "religious": 1
-            },
-            "activity": {
-                "activities": 2, "attractions": 2, "things to do": 2, "sightseeing": 2,
-                "tour": 2, "visit": 2, "explore": 2, "museums": 2, "temples": 2,
-                "parks": 2, "hiking": 2, "adventure": 2, "itinerary": 3, "plan": 2,
-                "schedule": 2, "day": 1, "morning": 1, "afternoon": 1, "evening": 1
-            },
-            "food": {
-                "food": 2, "cuisine": 2, "restaurant": 2, "dining": 2, "eat": 2,
-                "dish": 2, "street food": 2, "vegetarian": 1, "vegan": 1, "halal": 1,
-                "kosher": 1, "allergies": 1, "menu": 1, "breakfast": 1, "lunch": 1,
-                "dinner": 1, "snacks": 1, "drinks": 1
-            },
-            "language": {
-                "language": 2, "translate": 2, "phrases": 2, "speak": 2, "communication": 2,
-                "pronunciation": 2, "greetings": 2, "directions": 2, "help": 2,
-                "emergency": 2, "polite": 1, "formal": 1, "informal": 1
-            }
-        }
-        
-        for agent_name, keywords in keyword_weights.items():
-            score = 0
-            for keyword, weight in keywords.items():
-                if keyword in query_lower:
-                    score += weight
-            agent_scores[agent_name] = score
+        # Weighted keyword matching over a single scan of the query
+        for agent_name, keywords in KEYWORD_WEIGHTS.items():
+            agent_scores[agent_name] = sum(
+                weight for keyword, weight in keywords.items() if keyword in hits
+            )
         
         return agent_scores
     
@@ -89,18 +268,12 @@ class AgentCoordinator:
         
         # Special handling for itinerary/planning queries - ALWAYS use all agents
         if self._is_itinerary_query(query):
-            print(f"🎯 Detected itinerary query: '{query}' - Using all agents for comprehensive planning")
+            log_event(logger, logging.INFO, "routing", sampled=True, router="keyword", reason="itinerary", agents="all", query=query)
             return ["culture", "activity", "food", "language"]  # All agents for comprehensive planning
         
         # Enhanced detection for travel-related queries
-        query_lower = query.lower()
-        travel_indicators = [
-            "vietnam", "ho chi minh", "hanoi", "hoi an", "saigon",
-            "visit", "travel", "trip", "vacation", "holiday", "destination"
-        ]
-        
-        if any(indicator in query_lower for indicator in travel_indicators):
-            print(f"🌍 Detected travel query: '{query}' - Using all agents for comprehensive guidance")
+        if self.keyword_matcher.contains_any(query, TRAVEL_INDICATORS):
+            log_event(logger, logging.INFO, "routing", sampled=True, router="keyword", reason="travel", agents="all", query=query)
             return ["culture", "activity", "food", "language"]
         
         if max_score == 0:
@@ -114,75 +287,220 @@ class AgentCoordinator:
         
         return selected_agents if selected_agents else ["culture"]  # Default fallback
     
+    def route_query(self, query: str, query_embedding: Optional[List[float]] = None) -> Tuple[List[str], bool]:
+        """Pick agents with the configured router; returns (agents, is_itinerary)"""
+        if self.intent_router is not None:
+            if query_embedding is None:
+                query_embedding = self.intent_router.embed(query)
+            selected_agents, is_itinerary = self.intent_router.route(query_embedding)
+            log_event(logger, logging.INFO, "routing", sampled=True, router="embedding", agents=selected_agents, itinerary=is_itinerary, query=query)
+            return selected_agents, is_itinerary
+        return self.select_agents(query), self._is_itinerary_query(query)
+    
+    def route_decision(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Complete routing decision (agents, itinerary flag, scores), memoized per normalized query.
+        
+        Routing depends only on the query text, so repeated questions and
+        follow-up clicks skip the keyword and itinerary analysis. Returns the
+        decision and whether it came from the cache.
+        """
+        key = normalize_query(query)
+        decision = self.routing_cache.get(key)
+        if decision is not None:
+            return decision, True
+        
+        selected_agents, is_itinerary = self.route_query(query, query_embedding)
+        if self.intent_router is not None and query_embedding is not None:
+            agent_scores = self.intent_router.score(query_embedding)
+        else:
+            agent_scores = self.analyze_query(query)
+        decision = {"agents": tuple(selected_agents), "is_itinerary": is_itinerary, "scores": agent_scores}
+        self.routing_cache.put(key, decision)
+        return decision, False
+    
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit rates of the coordinator's caches"""
+        stats = {
+            "routing": self.routing_cache.stats(),
+            "keyword_scan": self.keyword_matcher.cache.stats(),
+            "in_flight": self._in_flight.stats(),
+            "speculative_search": self.retrieval_tracker.stats(),
+        }
+        if self.web_cache is not None:
+            stats["web_search"] = self.web_cache.stats()
+        if self.response_cache is not None:
+            stats["response"] = self.response_cache.stats()
+        return stats
+    
+    def get_circuit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """State and counters of the circuit breakers around external services"""
+        return {"web_search": self.web_search_breaker.stats()}
+    
+    def get_tier_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, latency, tokens and list-price cost per model tier"""
+        return {
+            tier: dict(stats, cost_usd=cost_usd(stats["model"], stats["input_tokens"], stats["output_tokens"]))
+            for tier, stats in self.tier_metrics.stats().items()
+        }
+    
     def _is_itinerary_query(self, query: str) -> bool:
         """Detect if query is asking for itinerary/planning"""
-        itinerary_keywords = [
-            "itinerary", "plan", "planning", "schedule", "day", "trip", "visit",
-            "spend a day", "what to do", "things to do", "recommendations",
-            "guide", "tour", "explore", "experience", "activities", "attractions",
-            "plan a day", "day in", "visit", "travel to", "going to", "trip to",
-            "vacation", "holiday", "sightseeing", "must see", "top places",
-            "best places", "where to go", "what to see", "places to visit"
-        ]
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in itinerary_keywords)
+        return self.keyword_matcher.contains_any(query, ITINERARY_KEYWORDS)
     
     def _infer_agents_from_context(self, query: str) -> List[str]:
         """Infer which agents to use when no specific keywords are found"""
-        query_lower = query.lower()
+        hits = self.keyword_matcher.scan(query)
         
         # Common travel query patterns
-        if any(word in query_lower for word in ["visit", "travel", "trip", "destination"]):
-            return ["culture", "activity"]  # General travel queries
-        elif any(word in query_lower for word in ["recommend", "suggest", "best"]):
-            return ["culture", "activity", "food"]  # Recommendation queries
-        elif any(word in query_lower for word in ["plan", "itinerary", "schedule"]):
-            return ["culture", "activity", "food", "language"]  # Planning queries
-        else:
-            return ["culture"]  # Default to culture agent
+        for words, agents in INFERENCE_RULES:
+            if any(word in hits for word in words):
+                return list(agents)
+        return ["culture"]  # Default to culture agent
     
-    def coordinate_response(self, query: str) -> Dict[str, Any]:
-        """Coordinate multiple agents to provide comprehensive response"""
-        
-        # Select relevant agents
-        selected_agents = self.select_agents(query)
+    def build_query_plan(self, query: str) -> QueryPlan:
+        """Derive routing, destination, preferences and the query embedding once"""
+        sanitized_query = self.agents["culture"].sanitize_input(query)
         
-        if len(selected_agents) == 1:
-            # Single agent response
-            agent = self.agents[selected_agents[0]]
-            result = agent.process_query(query)
-            return {
-                "response": result["response"],
-                "sources": result["sources"],
-                "agents_used": [result["agent"]],
-                "collaboration": False
-            }
-        
-        # Multi-agent collaboration with enhanced coordination
+        with span("embedding"):
+            try:
+                query_embedding = self.embeddings.embed_query(sanitized_query)
+            except Exception as e:
+                log_event(logger, logging.WARNING, "query_embedding_failed", error=str(e))
+                query_embedding = None
+        
+        with span("routing", mode=self.routing_mode) as routing_span:
+            decision, routing_cached = self.route_decision(sanitized_query, query_embedding)
+            routing_span.set(agents=list(decision["agents"]), cache_hit=routing_cached)
+        
+        with span("preferences"):
+            destination = (
+                self._extract_destination_from_query(sanitized_query)
+                or self.agents["culture"].extract_destination(sanitized_query)
+            )
+            
+            food_agent = self.agents["food"]
+            is_vegetarian, is_vegan, allergies = food_agent.extract_dietary_preferences(sanitized_query)
+            meal_type, food_budget = food_agent.extract_meal_and_budget(sanitized_query)
+            activity_types, activity_budget = self.agents["activity"].extract_activity_types(sanitized_query)
+            language_preferences = self.agents["language"].extract_language_preferences(sanitized_query)
+        
+        return QueryPlan(
+            query=query,
+            sanitized_query=sanitized_query,
+            selected_agents=list(decision["agents"]),
+            is_itinerary=decision["is_itinerary"],
+            agent_scores=dict(decision["scores"]),
+            routing_cached=routing_cached,
+            destination=destination,
+            query_embedding=query_embedding,
+            is_vegetarian=is_vegetarian,
+            is_vegan=is_vegan,
+            allergies=allergies,
+            meal_type=meal_type,
+            food_budget=food_budget,
+            activity_types=activity_types,
+            activity_budget=activity_budget,
+            language_preferences=language_preferences,
+        )
+    
+    def _run_agent(
+        self,
+        agent_name: str,
+        plan: QueryPlan,
+        collaboration_context: Optional[str],
+        budget: LatencyBudget
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Run one agent under its share of the latency budget.
+        
+        Returns the agent response and whether the agent timed out.
+        """
+        agent = self.agents[agent_name]
+        deadline = budget.next_deadline()
+        with span(f"agent.{agent_name}", deadline_s=round(deadline.seconds, 2)) as agent_span:
+            if deadline.expired:
+                agent_span.set(timed_out=True)
+                return self._timed_out_response(agent, plan.query), True
+            
+            # The worker runs in a copy of this context so its spans join the request trace
+            future = self._executor.submit(
+                in_current_context(agent.process_query), plan.sanitized_query, collaboration_context, deadline, plan
+            )
+            try:
+                return future.result(timeout=deadline.remaining()), False
+            except (FuturesTimeout, DeadlineExceeded):
+                # Stop the agent at its next checkpoint and continue without it
+                deadline.cancel()
+                future.cancel()
+                agent_span.set(timed_out=True)
+                log_event(logger, logging.WARNING, "agent_deadline_missed", agent=agent.agent_name, deadline_s=round(deadline.seconds, 2))
+                return self._timed_out_response(agent, plan.query), True
+    
+    def _timed_out_response(self, agent: BaseAgent, query: str) -> Dict[str, Any]:
+        """Stand-in response for an agent that did not finish in time"""
+        return {
+            "agent": agent.agent_name,
+            "response": agent._get_fallback_response(query),
+            "sources": [],
+            "confidence": 0.4,
+            "timed_out": True
+        }
+    
+    def _run_fused_itinerary(
+        self,
+        plan: QueryPlan,
+        budget: LatencyBudget
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """Write the whole itinerary in one LLM call; None responses mean use the per-agent path"""
+        deadline = Deadline(budget.remaining() * self.fused_share)
+        with span("fused_itinerary") as fused_span:
+            future = self._executor.submit(in_current_context(run_fused_itinerary), self.agents, plan, deadline)
+            try:
+                return future.result(timeout=deadline.remaining())
+            except (FuturesTimeout, DeadlineExceeded):
+                deadline.cancel()
+                future.cancel()
+                fused_span.set(timed_out=True)
+                log_event(logger, logging.WARNING, "fused_itinerary_deadline_missed", deadline_s=round(deadline.seconds, 2))
+                return None, None
+    
+    def _collaborate(
+        self,
+        plan: QueryPlan,
+        budget: LatencyBudget
+    ) -> Tuple[List[Dict[str, Any]], List[str], Dict[str, int]]:
+        """Run the selected agents in turn, each seeing the earlier agents' insights.
+        
+        Also returns collaboration-context token counts: tokens used, the
+        baseline the old truncation approach would have used, and tokens saved.
+        """
         agent_responses = []
-        collaboration_context = ""
+        timed_out_agents = []
+        context_tokens = {"used": 0, "baseline": 0, "saved": 0}
         
         # Get responses from all selected agents with iterative collaboration
-        for i, agent_name in enumerate(selected_agents):
-            agent = self.agents[agent_name]
-            
-            # Enhanced collaboration context for later agents
-            enhanced_context = collaboration_context
-            if i > 0:  # For agents after the first one
-                enhanced_context += f"\n\nPrevious agent insights:\n"
-                for j, prev_response in enumerate(agent_responses):
-                    if prev_response["confidence"] > 0.5:
-                        enhanced_context += f"- {prev_response['agent']}: {prev_response['response'][:150]}...\n"
+        for i, agent_name in enumerate(plan.selected_agents):
+            # Later agents get a compact, budgeted digest of the earlier answers
+            collaboration_context = ""
+            if i > 0:
+                collaboration_context, used = compact_collaboration_context(
+                    agent_responses, self.collaboration_token_budget
+                )
+                baseline = count_tokens(truncation_baseline(agent_responses))
+                context_tokens["used"] += used
+                context_tokens["baseline"] += baseline
+                context_tokens["saved"] += baseline - used
             
             try:
-                response = agent.process_query(query, enhanced_context)
+                response, timed_out = self._run_agent(agent_name, plan, collaboration_context, budget)
                 agent_responses.append(response)
-                
-                # Build collaboration context for next agents
-                if response["confidence"] > 0.5:
-                    collaboration_context += f"\n{agent_name.title()} Agent: {response['response'][:200]}...\n"
+                if timed_out:
+                    timed_out_agents.append(response["agent"])
             except Exception as e:
-                print(f"Error processing query with {agent_name} agent: {e}")
+                log_event(logger, logging.ERROR, "agent_failed", exc_info=True, agent=agent_name, error=str(e))
                 # Add a fallback response for this agent
                 fallback_response = {
                     "agent": agent_name,
@@ -192,11 +510,130 @@ class AgentCoordinator:
                 }
                 agent_responses.append(fallback_response)
         
-        # Enhanced response combination for itinerary queries
-        if self._is_itinerary_query(query):
-            combined_response = self._create_itinerary_response(agent_responses, query)
+        return agent_responses, timed_out_agents, context_tokens
+    
+    def coordinate_response(self, query: str, profile: Optional[str] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Coordinate multiple agents to provide comprehensive response
+        
+        Concurrent requests for the same normalized query (e.g. several
+        sessions clicking the same suggestion) share a single run. The result's
+        "trace" lists the timed stages of that run (see agents.tracing).
+        
+        profile ("cprofile" or "sample", default PROFILE_REQUESTS) profiles
+        this request on its own run; the result's "profile" lists the hottest
+        functions and the file holding the full profile.
+        
+        Everything logged while handling the request carries its request_id
+        (also returned in the result) and the caller's session_id.
+        """
+        profile = profile or self.profile_mode
+        with request_context(session_id=session_id) as request_id:
+            started = time.perf_counter()
+            try:
+                if profile:
+                    result, shared = self._profiled(query, profile), False
+                else:
+                    result, shared = self._in_flight.do(normalize_query(query), lambda: self._coordinate(query))
+            except Exception as e:
+                self._observe_request(None, time.perf_counter() - started, error=True)
+                log_event(logger, logging.ERROR, "request_failed", exc_info=True, error=str(e))
+                raise
+            if shared:
+                result = dict(result, coalesced=True)
+            result["request_id"] = request_id
+            duration = time.perf_counter() - started
+            self._observe_request(result, duration)
+            log_event(
+                logger, logging.INFO, "request_completed", sampled=True,
+                duration_ms=round(duration * 1000, 1), agents=result["agents_used"],
+                timed_out_agents=result.get("timed_out_agents", []), coalesced=shared,
+                input_tokens=result["usage"]["input_tokens"], output_tokens=result["usage"]["output_tokens"],
+                cost_usd=round(result["usage"]["cost_usd"], 6)
+            )
+        return result
+    
+    def _profiled(self, query: str, mode: str) -> Dict[str, Any]:
+        """Run one request under a profiler, bypassing request coalescing so the profile is its own"""
+        with RequestProfiler(mode, interval=self.profile_interval) as profiler:
+            result = self._coordinate(query)
+        try:
+            result["profile"] = profiler.report(self.profile_dir)
+        except OSError as e:
+            log_event(logger, logging.WARNING, "profile_write_failed", error=str(e))
+            result["profile"] = profiler.report(None)
+        return result
+    
+    def _observe_request(self, result: Optional[Dict[str, Any]], seconds: float, error: bool = False):
+        """Update the metrics for one request and refresh the metrics file if configured"""
+        self.metrics.observe_request(result, seconds, error)
+        if self.metrics_file:
+            try:
+                self.metrics.write(self.metrics_file)
+            except OSError as e:
+                log_event(logger, logging.WARNING, "metrics_write_failed", path=self.metrics_file, error=str(e))
+    
+    def _coordinate(self, query: str) -> Dict[str, Any]:
+        """One full multi-agent run for a query, traced stage by stage"""
+        with start_trace(query) as trace:
+            with span("request") as request_span:
+                result = self._run_request(query)
+                request_span.set(agents=result["agents_used"], fused=result.get("fused", False))
+        result["trace"] = trace.to_dict()
+        if self.trace_dir:
+            try:
+                result["trace_file"] = trace.write_chrome_trace(self.trace_dir)
+            except OSError as e:
+                log_event(logger, logging.WARNING, "trace_write_failed", error=str(e))
+        return result
+    
+    def _run_request(self, query: str) -> Dict[str, Any]:
+        """Route the query, run the selected agents and combine their answers"""
+        
+        # Select relevant agents and extract everything the agents need, once
+        with span("plan"):
+            plan = self.build_query_plan(query)
+        selected_agents = plan.selected_agents
+        budget = LatencyBudget(self.latency_budget, len(selected_agents))
+        
+        if len(selected_agents) == 1:
+            # Single agent response
+            result, timed_out = self._run_agent(selected_agents[0], plan, None, budget)
+            return {
+                "response": result["response"],
+                "sources": result["sources"],
+                "agents_used": [result["agent"]],
+                "collaboration": False,
+                "timed_out_agents": [result["agent"]] if timed_out else [],
+                "latency_budget": self.latency_budget,
+                "usage": usage_from_responses([result]),
+                "model_tier": result.get("model_tier"),
+                "routing_cache_hit": plan.routing_cached
+            }
+        
+        # Fused mode: a single structured call covers every itinerary section
+        fused_responses, fused_usage = None, None
+        if self.fused_itinerary and plan.is_itinerary and set(selected_agents) == set(SECTION_AGENTS):
+            fused_responses, fused_usage = self._run_fused_itinerary(plan, budget)
+        
+        if fused_responses is not None:
+            agent_responses = fused_responses
+            timed_out_agents = []
+            context_tokens = {"used": 0, "baseline": 0, "saved": 0}
+            usage = summarize_usage({"Fused itinerary": fused_usage})
         else:
-            combined_response = self._combine_responses(agent_responses, query)
+            # Multi-agent collaboration with enhanced coordination
+            agent_responses, timed_out_agents, context_tokens = self._collaborate(plan, budget)
+            usage = usage_from_responses(agent_responses)
+            if fused_usage is not None:
+                # A fused answer that could not be used still cost its tokens
+                usage = summarize_usage(dict(usage["by_agent"], **{"Fused itinerary (discarded)": fused_usage}))
+        
+        # Enhanced response combination for itinerary queries
+        with span("combine", itinerary=plan.is_itinerary):
+            if plan.is_itinerary:
+                combined_response = self._create_itinerary_response(agent_responses, query, plan.destination)
+            else:
+                combined_response = self._combine_responses(agent_responses, query)
         
         # Collect all sources
         all_sources = []
@@ -208,7 +645,13 @@ class AgentCoordinator:
             "sources": list(set(all_sources)),  # Remove duplicates
             "agents_used": [resp["agent"] for resp in agent_responses],
             "collaboration": True,
-            "individual_responses": agent_responses
+            "individual_responses": agent_responses,
+            "timed_out_agents": timed_out_agents,
+            "latency_budget": self.latency_budget,
+            "fused": fused_responses is not None,
+            "usage": usage,
+            "collaboration_tokens": context_tokens,
+            "routing_cache_hit": plan.routing_cached
         }
     
     def _combine_responses(self, responses: List[Dict[str, Any]], original_query: str) -> str:
@@ -242,7 +685,12 @@ class AgentCoordinator:
         
         return "\n".join(combined_parts)
     
-    def _create_itinerary_response(self, responses: List[Dict[str, Any]], original_query: str) -> str:
+    def _create_itinerary_response(
+        self,
+        responses: List[Dict[str, Any]],
+        original_query: str,
+        destination: Optional[str] = None
+    ) -> str:
         """Create a structured itinerary response combining all agent insights"""
         
         # Filter out low-confidence responses, but be more lenient for itinerary queries
@@ -286,8 +734,9 @@ Would you like me to provide more specific guidance for any particular aspect of
         itinerary_parts.append("## 🌍 Comprehensive Travel Itinerary")
         itinerary_parts.append("")
         
-        # Extract destination from original query for context
-        destination = self._extract_destination_from_query(original_query)
+        # Extract destination from original query for context, unless the plan already has it
+        if destination is None:
+            destination = self._extract_destination_from_query(original_query)
         if destination:
             itinerary_parts.append(f"**Destination:** {destination}")
             itinerary_parts.append("")
@@ -5,6 +5,8 @@ Food Agent - Specialized agent for cuisine, restaurants, dietary preferences, an
 import re
 from typing import List, Tuple, Optional
 from .base_agent import BaseAgent
+from .budget import Deadline
+from .query_plan import QueryPlan
 
 
 class FoodAgent(BaseAgent):
@@ -73,36 +75,54 @@ Format your responses with:
 - Recommendations for different occasions
 - For itineraries: meal timing and location coordination"""
     
+    # Dietary terms; a non-veg mention overrides vegetarian/vegan ones
+    VEGETARIAN_KEYWORDS = ["vegetarian", "veg-only", "veg friendly", "veg-friendly"]
+    VEGAN_KEYWORDS = ["vegan", "plant-based"]
+    NON_VEG_KEYWORDS = ["non-veg", "non veg", "meat lover", "steak"]
+    ALLERGY_KEYWORDS = ["allergy", "allergies", "allergic", "allergen", "allergens"]
+    KNOWN_ALLERGENS = [
+        "peanut", "peanuts", "tree nut", "tree nuts", "nut", "nuts", "almond", 
+        "cashew", "walnut", "pistachio", "hazelnut", "pecan", "macadamia", 
+        "brazil nut", "sesame", "soy", "soya", "gluten", "wheat", "dairy", 
+        "milk", "lactose", "egg", "eggs", "shellfish", "shrimp", "prawn", 
+        "crab", "lobster", "mollusk", "clam", "oyster", "fish", "mustard"
+    ]
+    
+    # Meal type and budget keywords, checked in order
+    MEAL_TYPE_KEYWORDS = {
+        "breakfast": ["breakfast", "morning"],
+        "lunch": ["lunch", "midday"],
+        "dinner": ["dinner", "evening", "night"],
+        "brunch": ["brunch"],
+    }
+    BUDGET_KEYWORDS = {
+        "budget": ["budget", "cheap", "affordable", "street food"],
+        "luxury": ["luxury", "expensive", "fine dining", "high-end"],
+    }
+    
+    def _get_preference_keywords(self) -> List[str]:
+        """Keywords used by the dietary and food preference extractors"""
+        groups = [
+            self.VEGETARIAN_KEYWORDS, self.VEGAN_KEYWORDS, self.NON_VEG_KEYWORDS,
+            self.ALLERGY_KEYWORDS, self.KNOWN_ALLERGENS,
+        ] + list(self.MEAL_TYPE_KEYWORDS.values()) + list(self.BUDGET_KEYWORDS.values())
+        return [word for group in groups for word in group]
+    
     def extract_dietary_preferences(self, text: str) -> Tuple[bool, bool, List[str]]:
         """Extract dietary preferences from user query"""
-        text_lower = text.lower()
+        hits = self.keyword_hits(text)
         
         # Check for vegetarian/vegan preferences
-        is_vegetarian = False
-        is_vegan = False
-        
-        if re.search(r"\b(vegetarian|veg-only|veg friendly|veg-friendly)\b", text_lower):
-            is_vegetarian = True
-        if re.search(r"\b(vegan|plant-based)\b", text_lower):
-            is_vegan = True
-        if re.search(r"\b(non-veg|non veg|meat lover|steak)\b", text_lower):
+        is_vegetarian = any(word in hits for word in self.VEGETARIAN_KEYWORDS)
+        is_vegan = any(word in hits for word in self.VEGAN_KEYWORDS)
+        if any(word in hits for word in self.NON_VEG_KEYWORDS):
             is_vegetarian = False
             is_vegan = False
         
         # Extract allergies
-        known_allergens = [
-            "peanut", "peanuts", "tree nut", "tree nuts", "nut", "nuts", "almond", 
-            "cashew", "walnut", "pistachio", "hazelnut", "pecan", "macadamia", 
-            "brazil nut", "sesame", "soy", "soya", "gluten", "wheat", "dairy", 
-            "milk", "lactose", "egg", "eggs", "shellfish", "shrimp", "prawn", 
-            "crab", "lobster", "mollusk", "clam", "oyster", "fish", "mustard"
-        ]
-        
         allergies = []
-        if "allerg" in text_lower or re.search(r"\bno\s+\w+\b", text_lower):
-            for allergen in known_allergens:
-                if re.search(rf"\b{re.escape(allergen)}\b", text_lower):
-                    allergies.append(allergen)
+        if any(word in hits for word in self.ALLERGY_KEYWORDS) or re.search(r"\bno\s+\w+\b", text.lower()):
+            allergies = [allergen for allergen in self.KNOWN_ALLERGENS if allergen in hits]
         
         # Normalize unique singular terms
         normalized = []
@@ -113,51 +133,56 @@ Format your responses with:
         
         return is_vegetarian, is_vegan, normalized
     
-    def extract_food_preferences(self, text: str) -> Tuple[Optional[str], str, List[str]]:
-        """Extract food preferences including budget and meal type"""
-        text_lower = text.lower()
+    def extract_meal_and_budget(self, text: str) -> Tuple[str, str]:
+        """Extract meal type and budget level from user query"""
+        hits = self.keyword_hits(text)
         
         # Extract meal type
         meal_type = "any"
-        if any(word in text_lower for word in ["breakfast", "morning"]):
-            meal_type = "breakfast"
-        elif any(word in text_lower for word in ["lunch", "midday"]):
-            meal_type = "lunch"
-        elif any(word in text_lower for word in ["dinner", "evening", "night"]):
-            meal_type = "dinner"
-        elif any(word in text_lower for word in ["brunch"]):
-            meal_type = "brunch"
+        for meal, words in self.MEAL_TYPE_KEYWORDS.items():
+            if any(word in hits for word in words):
+                meal_type = meal
+                break
         
         # Extract budget preference
         budget = "medium"
-        if any(word in text_lower for word in ["budget", "cheap", "affordable", "street food"]):
-            budget = "budget"
-        elif any(word in text_lower for word in ["luxury", "expensive", "fine dining", "high-end"]):
-            budget = "luxury"
+        for level, words in self.BUDGET_KEYWORDS.items():
+            if any(word in hits for word in words):
+                budget = level
+                break
+        
+        return meal_type, budget
+    
+    def extract_food_preferences(self, text: str) -> Tuple[Optional[str], str, List[str]]:
+        """Extract food preferences including budget and meal type"""
+        _, budget = self.extract_meal_and_budget(text)
         
         # Extract dietary preferences
         is_veg, is_vegan, allergies = self.extract_dietary_preferences(text)
         
         return self.extract_destination(text), budget, allergies
     
-    def process_query(self, query: str, collaboration_context: Optional[str] = None) -> dict:
+    def process_query(
+        self,
+        query: str,
+        collaboration_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        plan: Optional[QueryPlan] = None
+    ) -> dict:
         """Enhanced process query with food-specific logic"""
         
-        # Check if query is relevant
-        if not self.is_relevant_query(query):
-            return {
-                "agent": self.agent_name,
-                "response": f"This query is not relevant to my expertise in {self.agent_name.lower()}.",
-                "sources": [],
-                "confidence": 0.0
-            }
-        
-        # Extract preferences
-        destination, budget, allergies = self.extract_food_preferences(query)
-        is_veg, is_vegan, _ = self.extract_dietary_preferences(query)
-        
-        # Retrieve context
-        context = self.retrieve_context(query)
+        if plan is None:
+            # Check if query is relevant
+            if not self.is_relevant_query(query):
+                return self._not_relevant_response()
+            
+            # Extract preferences
+            destination = self.extract_destination(query)
+            _, budget = self.extract_meal_and_budget(query)
+            is_vegetarian, is_vegan, allergies = self.extract_dietary_preferences(query)
+        else:
+            destination, budget = plan.destination, plan.food_budget
+            is_vegetarian, is_vegan, allergies = plan.is_vegetarian, plan.is_vegan, plan.allergies
         
         # Enhance query with preferences for better context
         enhanced_query = f"{query}"
@@ -172,5 +197,5 @@ Format your responses with:
         if allergies:
             enhanced_query += f" (avoiding: {', '.join(allergies)})"
         
-        # Generate response
-        return self.generate_response(enhanced_query, context, collaboration_context)
+        # Retrieve context (with any speculative web search) and generate response
+        return self.retrieve_and_respond(query, enhanced_query, collaboration_context, deadline, plan)
@@ -0,0 +1,189 @@
+"""
+Fused Itinerary - One structured LLM call that writes all four itinerary sections
+"""
+
+import json
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from .base_agent import BaseAgent, usage_from_message
+from .prompt_builder import PromptBuilder
+from .budget import Deadline, DeadlineExceeded
+from .rate_limit import OUTPUT_TOKEN_ESTIMATE
+from .query_plan import QueryPlan
+from .structured_log import log_event
+from .usage import failed_call_entry, usage_entry
+
+logger = logging.getLogger(__name__)
+
+SECTION_AGENTS = ["culture", "activity", "food", "language"]
+
+FUSED_SYSTEM_PROMPT = """You are a team of four travel experts writing one itinerary together:
+- culture: traditions, etiquette, customs and cultural timing
+- activity: attractions, tours and a morning/afternoon/evening plan
+- food: meals, local dishes and dining tips that fit the activity schedule
+- language: phrases and communication tips for the situations in the plan
+
+Each expert follows their own itinerary guidelines:
+{guidelines}
+
+Write each section in Markdown, specific to the destination, without repeating
+what another section already covers.
+
+Respond with ONLY a JSON object with exactly these string keys:
+{{"culture": "...", "activity": "...", "food": "...", "language": "..."}}"""
+
+
+def _itinerary_guidelines(agent: BaseAgent) -> str:
+    """The 'For itinerary planning' part of an agent's system prompt"""
+    match = re.search(r"For itinerary planning:\n(.*?)(?:\n\n|$)", agent.system_prompt, re.DOTALL)
+    return match.group(1).strip() if match else ""
+
+
+def _preference_notes(plan: QueryPlan) -> List[str]:
+    """Preferences the per-agent path would have appended to each agent's query"""
+    notes = []
+    if plan.destination:
+        notes.append(f"Destination: {plan.destination}")
+    if plan.activity_types:
+        notes.append(f"Activity focus: {', '.join(plan.activity_types)}")
+    if plan.activity_budget != "medium" or plan.food_budget != "medium":
+        notes.append(f"Budget: activities {plan.activity_budget}, food {plan.food_budget}")
+    if plan.is_vegetarian:
+        notes.append("Diet: vegetarian")
+    if plan.is_vegan:
+        notes.append("Diet: vegan")
+    if plan.allergies:
+        notes.append(f"Avoid (allergies): {', '.join(plan.allergies)}")
+    if plan.language_preferences:
+        notes.append(f"Language formality: {plan.language_preferences.get('formality', 'neutral')}")
+    return notes
+
+
+def _as_markdown(value: Any) -> str:
+    """Sections should be strings, but tolerate lists or objects from the model"""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return "\n".join(f"- {_as_markdown(item)}" for item in value)
+    if isinstance(value, dict):
+        return "\n".join(f"**{key}:** {_as_markdown(item)}" for key, item in value.items())
+    return "" if value is None else str(value)
+
+
+def parse_sections(text: str) -> Optional[Dict[str, str]]:
+    """Parse the model's JSON answer into one Markdown string per agent"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        # Tolerate prose or code fences around the JSON object
+        match = re.search(r"\{.*\}", text, re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+    if not isinstance(data, dict):
+        return None
+
+    sections = {name: _as_markdown(data.get(name)) for name in SECTION_AGENTS}
+    return sections if any(sections.values()) else None
+
+
+def run_fused_itinerary(
+    agents: Dict[str, BaseAgent],
+    plan: QueryPlan,
+    deadline: Optional[Deadline] = None
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+    """Write all four itinerary sections with a single LLM call.
+
+    Returns per-agent responses shaped like BaseAgent.generate_response output
+    plus the call's token usage. Responses are None if the call failed or the
+    model did not return usable JSON (the coordinator then falls back to one
+    call per agent); the usage of an unusable answer is still returned so the
+    wasted call is billed to the request.
+    """
+    lead = agents["activity"]
+
+    # The agents share one index, so one retrieval serves every section
+    speculative_search = lead.start_speculative_search(plan.sanitized_query, plan)
+    context = lead.retrieve_context(plan.sanitized_query, plan.query_embedding)
+    docs = context.get("docs", [])
+    builder = PromptBuilder(lead.groq_model)
+    local_context = builder.fit_documents("local_docs", (getattr(d, "page_content", "") for d in docs))
+    sources = list(context.get("sources", []))
+
+    web_context = builder.fit(
+        "web", lead.resolve_web_search(plan.sanitized_query, local_context, speculative_search, deadline)
+    )
+    if web_context:
+        sources.append("Web Search Results")
+
+    guidelines = "\n\n".join(
+        f"{name}:\n{_itinerary_guidelines(agents[name])}" for name in SECTION_AGENTS
+    )
+    # The combined guidelines are instructions, so they are counted but never cut
+    system_prompt = FUSED_SYSTEM_PROMPT.format(guidelines=guidelines)
+    builder.record("system", system_prompt)
+
+    prompt_parts = [f"User query: {plan.sanitized_query}"]
+    notes = _preference_notes(plan)
+    if notes:
+        prompt_parts.append("Traveler preferences:\n" + "\n".join(f"- {note}" for note in notes))
+    builder.record("query", "\n\n".join(prompt_parts))
+    if local_context:
+        prompt_parts.append(f"Local knowledge:\n{local_context}")
+    if web_context:
+        prompt_parts.append(f"Web search results:\n{web_context}")
+    if not local_context and not web_context:
+        prompt_parts.append("No specific knowledge available - provide general expert guidance based on your training")
+
+    if deadline:
+        deadline.check("LLM call")
+    prompt = "\n\n".join(prompt_parts)
+    if not builder.fits():
+        log_event(
+            logger, logging.WARNING, "prompt_over_budget", agent="Fused itinerary", model=lead.groq_model,
+            prompt_tokens=builder.total_tokens, context_window=builder.budget.context_window
+        )
+    started = time.perf_counter()
+    try:
+        message = lead.invoke_llm(
+            [SystemMessage(content=system_prompt), HumanMessage(content=prompt)],
+            builder.total_tokens + 4 * OUTPUT_TOKEN_ESTIMATE,
+            deadline,
+            response_format={"type": "json_object"}
+        )
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        log_event(logger, logging.WARNING, "fused_itinerary_failed", error_type=type(e).__name__, error=str(e))
+        return None, failed_call_entry(lead.groq_model)
+
+    usage = usage_entry(lead.groq_model, **usage_from_message(message))
+    if lead.tier_metrics is not None:
+        lead.tier_metrics.record("large", lead.groq_model, time.perf_counter() - started, usage_from_message(message))
+
+    sections = parse_sections(message.content)
+    if sections is None:
+        log_event(logger, logging.WARNING, "fused_itinerary_invalid_json", output_tokens=usage["output_tokens"])
+        return None, usage
+
+    confidence = 0.8 if local_context else 0.6
+    responses = []
+    for name in SECTION_AGENTS:
+        agent = agents[name]
+        responses.append({
+            "agent": agent.agent_name,
+            "response": sections[name] or agent._get_fallback_response(plan.query),
+            "sources": sources,
+            "confidence": confidence if sections[name] else 0.4,
+            "fused": True,
+            "prompt_tokens": dict(builder.token_counts)
+        })
+    return responses, usage
@@ -0,0 +1,160 @@
+"""
+Intent Router - Embedding-based agent selection using per-agent centroid vectors
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Example queries per intent; each intent's centroid is the mean of their embeddings.
+# "itinerary" is a pseudo-intent that sends the query to every agent.
+INTENT_EXEMPLARS = {
+    "culture": [
+        "What are the local customs and etiquette I should know?",
+        "Tell me about traditional festivals and ceremonies",
+        "What cultural taboos should tourists avoid?",
+        "How should I dress when visiting a temple or church?",
+        "What are the wedding traditions in Japan?",
+        "Is tipping considered rude in this country?",
+        "What religious practices are important to respect?",
+        "How do people greet each other, do they bow or shake hands?",
+    ],
+    "activity": [
+        "What are the best attractions and landmarks to see?",
+        "Which museums are worth going to?",
+        "Recommend outdoor activities like hiking or trekking",
+        "Are there good guided tours or day excursions?",
+        "What family-friendly things are there for kids?",
+        "Where can I go shopping or to a night market?",
+        "What are some free sightseeing spots?",
+        "Which beaches, waterfalls or parks are nearby?",
+    ],
+    "food": [
+        "What local dishes should I try?",
+        "Recommend good restaurants for dinner",
+        "Where can I find the best street food?",
+        "Are there vegetarian or vegan options?",
+        "I have a peanut allergy, what should I avoid eating?",
+        "What is a typical breakfast there?",
+        "Which cafes serve good coffee?",
+        "What desserts and drinks are popular?",
+    ],
+    "language": [
+        "How do I say thank you in the local language?",
+        "Teach me some useful phrases for travelers",
+        "How do I ask for directions?",
+        "What language do people speak there?",
+        "How do I pronounce common greetings?",
+        "What should I say in an emergency?",
+        "How can I communicate if I don't speak the language?",
+        "What polite expressions should I use with elders?",
+    ],
+    "itinerary": [
+        "Plan a day in Hanoi for me",
+        "Create a 3-day itinerary for Tokyo",
+        "I'm visiting Rome next week, help me plan my trip",
+        "What should my schedule look like for a weekend in Paris?",
+        "Plan a full day of sightseeing, food and culture in Bangkok",
+        "Help me organize a week-long vacation in Vietnam",
+    ],
+}
+
+AGENT_NAMES = ["culture", "activity", "food", "language"]
+
+# Hand-picked starting threshold for MiniLM embeddings, not the output of a calibration
+# run. benchmarks/routing_comparison.py --calibrate reports a cross-validated threshold
+# to set as ROUTER_THRESHOLD for the exemplars and model actually deployed
+DEFAULT_THRESHOLD = 0.45
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class EmbeddingRouter:
+    """Selects agents by comparing the query embedding with precomputed intent centroids"""
+
+    def __init__(
+        self,
+        embeddings,
+        exemplars: Optional[Dict[str, List[str]]] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        exemplars = exemplars or INTENT_EXEMPLARS
+
+        # Embed every exemplar in one batch and average per intent
+        self.intents = list(exemplars)
+        texts = [text for intent in self.intents for text in exemplars[intent]]
+        vectors = _normalize_rows(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+        centroids = []
+        offset = 0
+        for intent in self.intents:
+            count = len(exemplars[intent])
+            centroids.append(vectors[offset:offset + count].mean(axis=0))
+            offset += count
+        self.centroids = _normalize_rows(np.vstack(centroids))
+
+    def embed(self, query: str) -> List[float]:
+        """Embed a query with the same model used for retrieval"""
+        return self.embeddings.embed_query(query)
+
+    def score(self, query_embedding: Sequence[float]) -> Dict[str, float]:
+        """Cosine similarity between the query and each intent centroid"""
+        vector = _normalize_rows(np.asarray(query_embedding, dtype=np.float32))
+        sims = self.centroids @ vector
+        return {intent: float(sim) for intent, sim in zip(self.intents, sims)}
+
+    def route(self, query_embedding: Sequence[float]) -> Tuple[List[str], bool]:
+        """Return the agents to use and whether the query is an itinerary request"""
+        return self._route_scores(self.score(query_embedding), self.threshold)
+
+    def _route_scores(self, scores: Dict[str, float], threshold: float) -> Tuple[List[str], bool]:
+        best_intent = max(scores, key=scores.get)
+        if best_intent == "itinerary" and scores[best_intent] >= threshold:
+            return list(AGENT_NAMES), True
+
+        selected = [name for name in AGENT_NAMES if scores.get(name, 0.0) >= threshold]
+        if not selected:
+            # Nothing clears the bar: use the single closest agent
+            selected = [max(AGENT_NAMES, key=lambda name: scores.get(name, 0.0))]
+        return selected, False
+
+    def calibrate(
+        self,
+        labelled: List[Tuple[str, List[str]]],
+        candidates: Optional[Sequence[float]] = None,
+    ) -> float:
+        """Pick the threshold with the best mean F1 on labelled (query, agents) pairs"""
+        candidates = candidates if candidates is not None else np.arange(0.20, 0.71, 0.01)
+        vectors = self.embeddings.embed_documents([query for query, _ in labelled])
+        all_scores = [self.score(vector) for vector in vectors]
+
+        best_threshold, best_f1 = self.threshold, -1.0
+        for threshold in candidates:
+            f1_total = 0.0
+            for scores, (_, expected) in zip(all_scores, labelled):
+                selected, _ = self._route_scores(scores, float(threshold))
+                f1_total += selection_f1(selected, expected)
+            mean_f1 = f1_total / max(len(labelled), 1)
+            if mean_f1 > best_f1:
+                best_threshold, best_f1 = float(threshold), mean_f1
+
+        self.threshold = best_threshold
+        return best_threshold
+
+
+def selection_f1(selected: Sequence[str], expected: Sequence[str]) -> float:
+    """F1 between the selected and the expected agent sets"""
+    selected, expected = set(selected), set(expected)
+    if not selected and not expected:
+        return 1.0
+    overlap = len(selected & expected)
+    if overlap == 0:
+        return 0.0
+    precision = overlap / len(selected)
+    recall = overlap / len(expected)
+    return 2 * precision * recall / (precision + recall)
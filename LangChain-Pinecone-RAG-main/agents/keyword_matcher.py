@@ -0,0 +1,98 @@
+"""
+Keyword Matcher - Single-pass multi-keyword matching for routing and relevance checks
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List
+
+from .cache import LRUCache, normalize_query
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _ends_word(text: str, end: int) -> bool:
+    """True if a word ends at `end`, allowing a plural "s"/"es" suffix"""
+    for suffix in ("", "s", "es"):
+        stop = end + len(suffix)
+        if text.startswith(suffix, end) and (stop >= len(text) or not _is_word_char(text[stop])):
+            return True
+    return False
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed keyword set.
+
+    The automaton is built once; `scan` walks the text a single time and returns
+    every keyword found on word boundaries (so "eat" does not match "great",
+    while "tradition" still matches "traditions").
+    Results are cached per normalized query, so the coordinator, the agents and the
+    preference extractors can all ask about the same query without rescanning it.
+    """
+
+    def __init__(self, keywords: Iterable[str], cache_size: int = 1024):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self.keywords: FrozenSet[str] = frozenset(k for k in (normalize_query(kw) for kw in keywords) if k)
+        self._build()
+        self.cache = LRUCache(maxsize=cache_size)
+
+    def _build(self):
+        """Build the trie, then the failure links breadth-first"""
+        for keyword in self.keywords:
+            node = 0
+            for ch in keyword:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][ch] = nxt
+                node = nxt
+            self._out[node].append(keyword)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Return all keywords that occur in `text` as whole words or phrases"""
+        text = normalize_query(text)
+        hits = self.cache.get(text)
+        if hits is None:
+            hits = self._scan(text)
+            self.cache.put(text, hits)
+        return hits
+
+    def _scan(self, text: str) -> FrozenSet[str]:
+        """Single pass of the automaton over already-normalized text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for keyword in out[node]:
+                start = i - len(keyword) + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if not _ends_word(text, i + 1):
+                    continue
+                hits.add(keyword)
+        return frozenset(hits)
+
+    def contains_any(self, text: str, keywords: Iterable[str]) -> bool:
+        """True if any of `keywords` occurs in `text`"""
+        hits = self.scan(text)
+        return any(keyword in hits for keyword in keywords)
@@ -4,6 +4,8 @@ Language Agent - Specialized agent for language help, translations, and communic
 
 from typing import List, Dict, Optional
 from .base_agent import BaseAgent
+from .budget import Deadline
+from .query_plan import QueryPlan
 
 
 class LanguageAgent(BaseAgent):
@@ -76,45 +78,53 @@ Format your responses with:
 - Alternative communication methods
 - For itineraries: situation-specific language guidance"""
     
+    # Languages a user may ask about, checked in order
+    COMMON_LANGUAGES = [
+        "english", "spanish", "french", "german", "italian", "portuguese",
+        "chinese", "japanese", "korean", "arabic", "hindi", "russian",
+        "thai", "vietnamese", "indonesian", "malay", "tagalog", "dutch",
+        "swedish", "norwegian", "danish", "finnish", "polish", "czech"
+    ]
+    
+    # Situation and formality keywords, checked in order
+    CONTEXT_KEYWORDS = {
+        "emergency": ["emergency", "help", "urgent"],
+        "dining": ["restaurant", "food", "dining"],
+        "shopping": ["shopping", "buy", "purchase"],
+        "directions": ["directions", "where", "how to get"],
+        "accommodation": ["hotel", "accommodation"],
+        "transportation": ["transport", "taxi", "bus", "train"],
+    }
+    FORMALITY_KEYWORDS = {
+        "formal": ["formal", "polite", "respectful"],
+        "informal": ["casual", "informal", "friendly"],
+    }
+    
+    def _get_preference_keywords(self) -> List[str]:
+        """Keywords used by extract_language_preferences"""
+        groups = [self.COMMON_LANGUAGES] + list(self.CONTEXT_KEYWORDS.values()) + list(self.FORMALITY_KEYWORDS.values())
+        return [word for group in groups for word in group]
+    
     def extract_language_preferences(self, text: str) -> Dict[str, str]:
         """Extract language preferences from user query"""
-        text_lower = text.lower()
+        hits = self.keyword_hits(text)
         
         # Extract target language
-        target_language = "local"
-        common_languages = [
-            "english", "spanish", "french", "german", "italian", "portuguese",
-            "chinese", "japanese", "korean", "arabic", "hindi", "russian",
-            "thai", "vietnamese", "indonesian", "malay", "tagalog", "dutch",
-            "swedish", "norwegian", "danish", "finnish", "polish", "czech"
-        ]
-        
-        for lang in common_languages:
-            if lang in text_lower:
-                target_language = lang
-                break
+        target_language = next((lang for lang in self.COMMON_LANGUAGES if lang in hits), "local")
         
         # Extract context/situation
         context = "general"
-        if any(word in text_lower for word in ["emergency", "help", "urgent"]):
-            context = "emergency"
-        elif any(word in text_lower for word in ["restaurant", "food", "dining"]):
-            context = "dining"
-        elif any(word in text_lower for word in ["shopping", "buy", "purchase"]):
-            context = "shopping"
-        elif any(word in text_lower for word in ["directions", "where", "how to get"]):
-            context = "directions"
-        elif any(word in text_lower for word in ["hotel", "accommodation"]):
-            context = "accommodation"
-        elif any(word in text_lower for word in ["transport", "taxi", "bus", "train"]):
-            context = "transportation"
+        for situation, words in self.CONTEXT_KEYWORDS.items():
+            if any(word in hits for word in words):
+                context = situation
+                break
         
         # Extract formality level
         formality = "neutral"
-        if any(word in text_lower for word in ["formal", "polite", "respectful"]):
-            formality = "formal"
-        elif any(word in text_lower for word in ["casual", "informal", "friendly"]):
-            formality = "informal"
+        for level, words in self.FORMALITY_KEYWORDS.items():
+            if any(word in hits for word in words):
+                formality = level
+                break
         
         return {
             "target_language": target_language,
@@ -150,24 +160,25 @@ Format your responses with:
         
         return phrases.get(context, phrases["greetings"])
     
-    def process_query(self, query: str, collaboration_context: Optional[str] = None) -> dict:
+    def process_query(
+        self,
+        query: str,
+        collaboration_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        plan: Optional[QueryPlan] = None
+    ) -> dict:
         """Enhanced process query with language-specific logic"""
         
-        # Check if query is relevant
-        if not self.is_relevant_query(query):
-            return {
-                "agent": self.agent_name,
-                "response": f"This query is not relevant to my expertise in {self.agent_name.lower()}.",
-                "sources": [],
-                "confidence": 0.0
-            }
-        
-        # Extract preferences
-        preferences = self.extract_language_preferences(query)
-        destination = self.extract_destination(query)
-        
-        # Retrieve context
-        context = self.retrieve_context(query)
+        if plan is None:
+            # Check if query is relevant
+            if not self.is_relevant_query(query):
+                return self._not_relevant_response()
+            
+            # Extract preferences
+            preferences = self.extract_language_preferences(query)
+            destination = self.extract_destination(query)
+        else:
+            preferences, destination = plan.language_preferences, plan.destination
         
         # Enhance query with preferences for better context
         enhanced_query = f"{query}"
@@ -175,5 +186,5 @@ Format your responses with:
             enhanced_query += f" for {destination}"
         enhanced_query += f" (context: {preferences['context']}, formality: {preferences['formality']})"
         
-        # Generate response
-        return self.generate_response(enhanced_query, context, collaboration_context)
+        # Retrieve context (with any speculative web search) and generate response
+        return self.retrieve_and_respond(query, enhanced_query, collaboration_context, deadline, plan)
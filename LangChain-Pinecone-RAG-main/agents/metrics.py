@@ -0,0 +1,241 @@
+"""
+Metrics - Prometheus-style counters and histograms for requests, agents, retrieval, search, tokens and caches
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .usage import cost_usd
+
+# Seconds; wide enough for both in-process stages and multi-agent requests
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 45.0)
+AGENT_COUNT_BUCKETS = (1, 2, 3, 4)
+TOKEN_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label combination"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._series[key] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}"
+                    )
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class AgentMetrics:
+    """The agent system's metrics, filled in from each request's result and trace"""
+
+    def __init__(self, prefix: str = "travel_guide"):
+        self.requests = Counter(
+            f"{prefix}_requests_total", "Requests handled, by path and outcome", ("path", "outcome"))
+        self.request_seconds = Histogram(
+            f"{prefix}_request_duration_seconds", "End-to-end coordinate_response latency", ("path",))
+        self.agents_per_request = Histogram(
+            f"{prefix}_agents_per_request", "Agents invoked per request", (), AGENT_COUNT_BUCKETS)
+        self.agent_timeouts = Counter(
+            f"{prefix}_agent_timeouts_total", "Agents that missed their share of the latency budget", ("agent",))
+        self.retrievals = Counter(
+            f"{prefix}_retrievals_total", "Retrievals by the threshold tier that produced the documents", ("agent", "tier"))
+        self.web_searches = Counter(
+            f"{prefix}_web_searches_total", "Web search invocations by outcome", ("agent", "outcome"))
+        self.llm_calls = Counter(
+            f"{prefix}_llm_calls_total", "LLM calls by outcome (error: the call raised, e.g. before a canned fallback)", ("agent", "model", "outcome"))
+        self.llm_tokens = Counter(
+            f"{prefix}_llm_tokens_total", "LLM tokens reported by the provider", ("agent", "model", "direction"))
+        self.llm_cost = Counter(
+            f"{prefix}_llm_cost_usd_total", "LLM cost in USD at list prices", ("agent", "model"))
+        self.request_tokens = Histogram(
+            f"{prefix}_request_tokens", "LLM tokens (input + output) per request", ("path",), TOKEN_BUCKETS)
+        self.request_cost = Counter(
+            f"{prefix}_request_cost_usd_total", "LLM cost in USD at list prices, by request path", ("path",))
+        self.cache_lookups = Counter(
+            f"{prefix}_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"))
+        self.stage_seconds = Histogram(
+            f"{prefix}_stage_duration_seconds", "Latency of each traced stage", ("stage", "agent"))
+        self._metrics = [
+            self.requests, self.request_seconds, self.agents_per_request, self.agent_timeouts,
+            self.retrievals, self.web_searches, self.llm_calls, self.llm_tokens, self.llm_cost,
+            self.request_tokens, self.request_cost, self.cache_lookups, self.stage_seconds,
+        ]
+
+    def observe_request(self, result: Optional[Dict[str, Any]], seconds: float, error: bool = False):
+        """Record one coordinate_response call; coalesced and failed calls only count as requests"""
+        if error or result is None:
+            path = "error"
+        elif result.get("coalesced"):
+            path = "coalesced"
+        elif result.get("fused"):
+            path = "fused"
+        elif result.get("collaboration"):
+            path = "collaboration"
+        else:
+            path = "single"
+        self.requests.inc(path=path, outcome="error" if error else "ok")
+        self.request_seconds.observe(seconds, path=path)
+        if path in ("error", "coalesced"):
+            return
+
+        self.agents_per_request.observe(len(result.get("agents_used", [])))
+        usage = result.get("usage", {})
+        self.request_tokens.observe(usage.get("input_tokens", 0) + usage.get("output_tokens", 0), path=path)
+        if usage.get("cost_usd"):
+            self.request_cost.inc(usage["cost_usd"], path=path)
+        for agent in result.get("timed_out_agents", []):
+            self.agent_timeouts.inc(agent=agent.lower())
+        for span in result.get("trace", []):
+            self._observe_span(span)
+
+    def _observe_span(self, span: Dict[str, Any]):
+        name = span["name"]
+        attributes = span.get("attributes", {})
+        agent = str(attributes.get("agent", "")).lower()
+        stage = name
+        if name.startswith("agent."):
+            stage, agent = "agent", name.split(".", 1)[1]
+        self.stage_seconds.observe(span["duration_ms"] / 1000, stage=stage, agent=agent)
+
+        if name == "routing" and "cache_hit" in attributes:
+            self.cache_lookups.inc(cache="routing", result="hit" if attributes["cache_hit"] else "miss")
+        elif name == "response_cache":
+            self.cache_lookups.inc(cache="response", result="hit" if attributes.get("hit") else "miss")
+        elif name == "retrieval":
+            self.retrievals.inc(agent=agent, tier=attributes.get("retrieval_tier", "none"))
+        elif name == "web_search":
+            if "cache_hit" in attributes:
+                self.cache_lookups.inc(cache="web_search", result="hit" if attributes["cache_hit"] else "miss")
+            if attributes.get("cache_hit"):
+                outcome = "cache_hit"
+            elif attributes.get("circuit_open"):
+                outcome = "circuit_open"
+            elif "error" in attributes:
+                outcome = "error"
+            else:
+                outcome = "searched"
+            self.web_searches.inc(agent=agent, outcome=outcome)
+        elif name == "llm":
+            model = attributes.get("model", "")
+            self.llm_calls.inc(agent=agent, model=model, outcome="error" if "error" in attributes else "ok")
+            for direction in ("input", "output"):
+                tokens = attributes.get(f"{direction}_tokens", 0)
+                if tokens:
+                    self.llm_tokens.inc(tokens, agent=agent, model=model, direction=direction)
+            cost = cost_usd(model, attributes.get("input_tokens", 0), attributes.get("output_tokens", 0))
+            if cost:
+                self.llm_cost.inc(cost, agent=agent, model=model)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write the metrics file atomically (e.g. for node_exporter's textfile collector)"""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temporary, path)
+
+
+def serve_metrics(metrics: AgentMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve GET /metrics on a background thread and return the server"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,98 @@
+"""
+Model Tiering - Route simple requests to a small, fast model and keep the large model for itineraries
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .query_plan import QueryPlan
+from .tokens import count_tokens
+
+MODEL_TIERS = {
+    "small": "llama-3.1-8b-instant",
+    "large": "llama-3.3-70b-versatile",
+}
+
+
+@dataclass(frozen=True)
+class TierPolicy:
+    """When an agent may use the small model.
+
+    `mode` is "auto" (decide per request), "small" or "large" (always).
+    In auto mode the small model is used only for single-agent, non-itinerary
+    queries whose text and retrieved context are within these limits.
+    """
+    mode: str = "auto"
+    max_query_tokens: int = 40
+    max_context_tokens: int = 1500
+
+
+DEFAULT_TIER_POLICIES = {
+    # Etiquette answers need nuance; only very light context goes to the small model
+    "culture": TierPolicy(max_context_tokens=1000),
+    "activity": TierPolicy(),
+    "food": TierPolicy(),
+    # Phrase lookups are the clearest small-model case
+    "language": TierPolicy(max_query_tokens=60, max_context_tokens=2000),
+}
+
+
+def policy_for_agent(agent_key: str) -> TierPolicy:
+    """Default policy for an agent, with MODEL_TIERING / MODEL_TIER_<AGENT> overrides"""
+    policy = DEFAULT_TIER_POLICIES.get(agent_key, TierPolicy())
+    mode = os.environ.get(f"MODEL_TIER_{agent_key.upper()}")
+    if mode is None and os.environ.get("MODEL_TIERING", "auto").lower() in ("off", "false", "0"):
+        mode = "large"
+    if mode:
+        policy = TierPolicy(mode.lower(), policy.max_query_tokens, policy.max_context_tokens)
+    return policy
+
+
+def choose_tier(policy: TierPolicy, plan: Optional[QueryPlan], docs: List[Any]) -> str:
+    """Pick "small" or "large" for one agent call"""
+    if policy.mode in MODEL_TIERS:
+        return policy.mode
+    # Without a plan the agent was called directly; keep the established behaviour
+    if plan is None or plan.is_itinerary or len(plan.selected_agents) > 1:
+        return "large"
+    if count_tokens(plan.sanitized_query) > policy.max_query_tokens:
+        return "large"
+    context_tokens = sum(count_tokens(getattr(d, "page_content", "")) for d in docs)
+    if context_tokens > policy.max_context_tokens:
+        return "large"
+    return "small"
+
+
+class TierMetrics:
+    """Latency and token totals per model tier"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, tier: str, model: str, latency: float, usage: Dict[str, int]):
+        with self._lock:
+            entry = self._tiers.setdefault(tier, {
+                "model": model, "calls": 0, "latency_seconds": 0.0,
+                "input_tokens": 0, "output_tokens": 0,
+            })
+            entry["calls"] += 1
+            entry["latency_seconds"] += latency
+            entry["input_tokens"] += usage.get("input_tokens", 0)
+            entry["output_tokens"] += usage.get("output_tokens", 0)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tier call count, mean latency and token totals"""
+        with self._lock:
+            return {
+                tier: dict(
+                    entry,
+                    avg_latency=entry["latency_seconds"] / entry["calls"] if entry["calls"] else 0.0,
+                    output_tokens_per_second=(
+                        entry["output_tokens"] / entry["latency_seconds"] if entry["latency_seconds"] else 0.0
+                    ),
+                )
+                for tier, entry in self._tiers.items()
+            }
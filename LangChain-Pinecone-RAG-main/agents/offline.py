@@ -0,0 +1,252 @@
+"""
+Offline Providers - Deterministic local stand-ins for Groq, Pinecone and DuckDuckGo
+
+Used to benchmark and load-test the agents without network access or API keys.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+
+from .fused_itinerary import SECTION_AGENTS
+from .model_tiering import MODEL_TIERS
+from .rate_limit import RateLimiter
+from .tokens import count_tokens
+from .web_cache import WebResultCache
+
+
+def _seed(*parts: str) -> int:
+    digest = hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()
+    return int(digest[:12], 16)
+
+
+class HashEmbeddings(Embeddings):
+    """Bag of hashed words and word pairs, L2-normalized (384 dimensions like MiniLM)"""
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            seed = _seed(feature)
+            vector[seed % self.dimension] += 1.0 if (seed >> 20) & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+class FakeRateLimitError(Exception):
+    """Shaped like a Groq 429 so the retry layer treats it the same way"""
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("Rate limit reached (offline simulation)")
+        self.response = type("Response", (), {"status_code": 429, "headers": {"retry-after": str(retry_after)}})()
+
+
+class FakeChatModel:
+    """Chat model that sleeps like a hosted LLM and returns canned, query-specific text.
+
+    Each call waits a log-normally distributed time to first token, then
+    generates its output tokens at a normally distributed tokens-per-second
+    rate. Randomness is seeded from the prompt, so the same prompt always
+    gets the same answer, token counts and latency.
+    """
+
+    def __init__(
+        self,
+        time_to_first_token: float = 0.4,
+        time_to_first_token_sigma: float = 0.3,
+        tokens_per_second: float = 250.0,
+        tokens_per_second_sd: float = 50.0,
+        output_tokens: int = 300,
+        output_tokens_sd: int = 80,
+        rate_limit_probability: float = 0.0,
+        seed: int = 0,
+    ):
+        self.time_to_first_token = time_to_first_token
+        self.time_to_first_token_sigma = time_to_first_token_sigma
+        self.tokens_per_second = tokens_per_second
+        self.tokens_per_second_sd = tokens_per_second_sd
+        self.output_tokens = output_tokens
+        self.output_tokens_sd = output_tokens_sd
+        self.rate_limit_probability = rate_limit_probability
+        self.seed = seed
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _answer(self, query: str, output_tokens: int, rng: random.Random) -> str:
+        sentences = [f"Offline answer for: {query.strip()}."]
+        while count_tokens(" ".join(sentences)) < output_tokens:
+            sentences.append(
+                f"Stop {len(sentences)} opens at {rng.randint(6, 11)}:00 and costs about "
+                f"{rng.randint(2, 40)} USD, {rng.choice(['near the Old Quarter', 'by the river', 'in the market district', 'close to the main temple'])}."
+            )
+        return " ".join(sentences)
+
+    def invoke(self, messages: List[Any], **kwargs) -> AIMessage:
+        prompt = "\n".join(str(getattr(m, "content", m)) for m in messages)
+        rng = random.Random(_seed(str(self.seed), prompt))
+        with self._lock:
+            self.calls += 1
+
+        if rng.random() < self.rate_limit_probability:
+            raise FakeRateLimitError(retry_after=round(rng.uniform(0.5, 2.0), 1))
+
+        output_tokens = max(20, int(rng.gauss(self.output_tokens, self.output_tokens_sd)))
+        rate = max(10.0, rng.gauss(self.tokens_per_second, self.tokens_per_second_sd))
+        first_token = rng.lognormvariate(math.log(self.time_to_first_token), self.time_to_first_token_sigma)
+        latency = first_token + output_tokens / rate
+
+        timeout = kwargs.get("timeout")
+        if timeout is not None and latency > timeout:
+            time.sleep(max(timeout, 0.0))
+            raise TimeoutError(f"Offline model did not answer within {timeout:.1f}s")
+        time.sleep(latency)
+
+        query_match = re.search(r"User query: (.*)", prompt)
+        query = query_match.group(1) if query_match else "your trip"
+        if kwargs.get("response_format", {}).get("type") == "json_object":
+            share = max(20, output_tokens // len(SECTION_AGENTS))
+            content = json.dumps({name: self._answer(query, share, rng) for name in SECTION_AGENTS})
+        else:
+            content = self._answer(query, output_tokens, rng)
+
+        input_tokens = count_tokens(prompt)
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+
+class InMemoryIndex:
+    """Exact cosine-similarity search over documents held in memory"""
+
+    def __init__(self, embeddings: Embeddings, documents: Sequence[Document] = ()):
+        self.embeddings = embeddings
+        self.documents: List[Document] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._revision = 0
+        self._lock = threading.Lock()
+        if documents:
+            self.add_documents(documents)
+
+    def add_documents(self, documents: Sequence[Document], ids: Optional[Sequence[str]] = None):
+        ids = list(ids) if ids is not None else [None] * len(documents)
+        vectors = np.asarray(
+            self.embeddings.embed_documents([d.page_content for d in documents]), dtype=np.float32
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+        with self._lock:
+            for doc, doc_id in zip(documents, ids):
+                doc_id = doc_id or doc.id or f"offline_id_{len(self.documents)}"
+                self.documents.append(Document(id=doc_id, page_content=doc.page_content, metadata=dict(doc.metadata)))
+            self._matrix = vectors if self._matrix.size == 0 else np.vstack([self._matrix, vectors])
+            self._revision += 1
+
+    def search(self, embedding: Sequence[float], k: int) -> List[Tuple[Document, float]]:
+        if not self.documents:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        similarities = self._matrix @ query
+        k = min(k, len(self.documents))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        # Same relevance mapping LangChain applies to Pinecone cosine scores
+        return [(self.documents[i], (float(similarities[i]) + 1) / 2) for i in top]
+
+    def version(self) -> str:
+        return str(self._revision)
+
+
+class CannedWebSearch:
+    """Web search that returns fixed snippets after a fixed delay"""
+
+    def __init__(self, results: Optional[Dict[str, str]] = None, latency: float = 0.3):
+        self.results = {key.lower(): value for key, value in (results or {}).items()}
+        self.latency = latency
+        self.calls = 0
+
+    def run(self, query: str) -> str:
+        self.calls += 1
+        time.sleep(self.latency)
+        lowered = query.lower()
+        for key, value in self.results.items():
+            if key in lowered:
+                return value
+        return (
+            f"Travel guides recommend visiting early in the morning to avoid crowds. "
+            f"Local markets and street food stalls are popular with visitors. "
+            f"Results for: {query}"
+        )
+
+
+def load_sample_documents() -> List[Document]:
+    """The travel guides and bundled PDFs from ingestion.py, split the same way"""
+    from ingestion import load_pdf_documents, create_travel_documents, split_documents
+    return split_documents(load_pdf_documents() + create_travel_documents())
+
+
+def build_offline_coordinator(
+    documents: Optional[Sequence[Document]] = None,
+    llm: Optional[FakeChatModel] = None,
+    small_llm: Optional[FakeChatModel] = None,
+    web_search_tool: Optional[CannedWebSearch] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    **kwargs
+):
+    """AgentCoordinator wired to offline stand-ins, sharing one index like the real agents do.
+
+    Without `rate_limiter` the agents get limiters with very high limits, so
+    measurements reflect the application rather than Groq quotas. Limiters are
+    passed to the agents rather than installed process-wide, canned web results
+    go to an in-memory cache, and logging setup and the METRICS_PORT server are
+    off unless `configure_logs=True` or `metrics_port` is passed, so building
+    one touches no process-wide state.
+    """
+    from .coordinator import AgentCoordinator
+
+    embeddings = HashEmbeddings()
+    index = InMemoryIndex(embeddings, documents if documents is not None else load_sample_documents())
+    coordinator_kwargs = {"groq_model": MODEL_TIERS["large"], "small_groq_model": MODEL_TIERS["small"], **kwargs}
+    coordinator_kwargs.setdefault("rate_limiters", {
+        model: rate_limiter or RateLimiter(requests_per_minute=1e6, tokens_per_minute=1e9, max_concurrent=64)
+        for model in (coordinator_kwargs["groq_model"], coordinator_kwargs["small_groq_model"])
+    })
+    if "web_cache" not in coordinator_kwargs:
+        web_cache_size = int(os.environ.get("WEB_CACHE_SIZE", "5000"))
+        coordinator_kwargs["web_cache"] = WebResultCache(
+            path=":memory:", max_entries=web_cache_size
+        ) if web_cache_size > 0 else None
+    coordinator_kwargs.setdefault("configure_logs", False)
+    coordinator_kwargs.setdefault("metrics_port", 0)
+    return AgentCoordinator(
+        llm=llm or FakeChatModel(),
+        # The small tier answers sooner and streams roughly three times faster
+        small_llm=small_llm or FakeChatModel(time_to_first_token=0.2, tokens_per_second=750.0, tokens_per_second_sd=100.0),
+        embeddings=embeddings,
+        vector_index=index,
+        web_search_tool=web_search_tool or CannedWebSearch(),
+        **coordinator_kwargs
+    )
@@ -0,0 +1,182 @@
+"""
+Request Profiling - Deterministic (cProfile) or sampling profiles of one request across its worker threads
+"""
+
+import contextvars
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+PROFILE_MODES = ("cprofile", "sample")
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "profiles")
+MAX_STACK_DEPTH = 128
+
+_active_profiler: contextvars.ContextVar[Optional["RequestProfiler"]] = contextvars.ContextVar("profiler", default=None)
+
+Frame = Tuple[str, int, str]
+
+
+def _label(frame: Frame) -> str:
+    filename, line, name = frame
+    if filename.startswith("~") or filename.startswith("<"):
+        # Built-ins as reported by cProfile, e.g. ('~', 0, "<method 'acquire' ...>")
+        return name
+    short = os.path.join(*os.path.normpath(filename).split(os.sep)[-2:])
+    return f"{name} ({short}:{line})"
+
+
+class RequestProfiler:
+    """Profile one request on the calling thread and on every worker thread it attaches.
+
+    "cprofile" runs a deterministic profiler per thread and merges them; it
+    counts every call but slows Python code down. "sample" records the stacks
+    of the request's threads every `interval` seconds, which is cheap and
+    shows where wall-clock time goes, including time spent waiting.
+    """
+
+    def __init__(self, mode: str = "cprofile", interval: float = 0.005):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; expected one of {PROFILE_MODES}")
+        self.mode = mode
+        self.interval = interval
+        self.duration = 0.0
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+        self._threads: Dict[int, int] = {}
+        self._samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "RequestProfiler":
+        self._token = _active_profiler.set(self)
+        self._started = time.perf_counter()
+        if self.mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+            self._sampler.start()
+        self._attachment = self.attach()
+        self._attachment.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._attachment.__exit__(*exc_info)
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+        _active_profiler.reset(self._token)
+        return False
+
+    @contextmanager
+    def attach(self):
+        """Include the current thread in the profile while the block runs"""
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler already owns this thread
+                profile = None
+            try:
+                yield
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    with self._lock:
+                        self._profiles.append(profile)
+            return
+
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                if stack:
+                    self._samples[tuple(reversed(stack))] += 1
+
+    def _cprofile_top(self, top: int) -> Tuple[Optional[pstats.Stats], List[Dict[str, Any]]]:
+        if not self._profiles:
+            return None, []
+        stats = pstats.Stats(self._profiles[0])
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        return stats, [
+            {"function": _label(frame), "calls": calls, "self_s": self_time, "cumulative_s": cumulative}
+            for frame, (_, calls, self_time, cumulative, _) in rows
+        ]
+
+    def _sample_top(self, top: int) -> List[Dict[str, Any]]:
+        self_counts, cumulative_counts = Counter(), Counter()
+        for stack, count in self._samples.items():
+            self_counts[stack[-1]] += count
+            for frame in set(stack):
+                cumulative_counts[frame] += count
+        return [
+            {
+                "function": _label(frame),
+                "samples": count,
+                "self_s": count * self.interval,
+                "cumulative_s": cumulative_counts[frame] * self.interval,
+            }
+            for frame, count in self_counts.most_common(top)
+        ]
+
+    def report(self, directory: Optional[str] = DEFAULT_DIR, top: int = 15) -> Dict[str, Any]:
+        """Hottest functions by self time, after writing the full profile to directory if given.
+
+        cProfile output is a .prof file for pstats or snakeviz; samples are
+        written as collapsed stacks (.folded) for flamegraph.pl or speedscope.
+        """
+        path = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(directory, f"profile-{stamp}-{id(self):x}")
+        if self.mode == "cprofile":
+            stats, functions = self._cprofile_top(top)
+            if path and stats is not None:
+                path += ".prof"
+                stats.dump_stats(path)
+        else:
+            functions = self._sample_top(top)
+            if path:
+                path += ".folded"
+                with open(path, "w", encoding="utf-8") as f:
+                    for stack, count in self._samples.items():
+                        f.write(";".join(_label(frame) for frame in stack) + f" {count}\n")
+        return {"mode": self.mode, "duration_s": self.duration, "file": path, "top": functions}
+
+
+@contextmanager
+def attach_current_thread():
+    """Add the current thread to the profile active in this context, if any"""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.attach():
+        yield
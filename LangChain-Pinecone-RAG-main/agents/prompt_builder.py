@@ -0,0 +1,117 @@
+"""
+Prompt Builder - Token-budgeted prompt assembly with per-section token accounting
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable
+
+from .tokens import count_tokens, truncate_to_tokens
+
+
+@dataclass(frozen=True)
+class PromptBudget:
+    """Token budgets for one model's prompts"""
+    context_window: int
+    max_output_tokens: int
+    system: int
+    collaboration: int
+    local_docs: int
+    web: int
+
+
+# Budgets are far below the context windows: on Groq, prompt tokens count
+# against per-minute rate limits and dominate latency for long prompts
+MODEL_BUDGETS = {
+    "llama-3.3-70b-versatile": PromptBudget(
+        context_window=131072, max_output_tokens=2048,
+        system=800, collaboration=400, local_docs=1200, web=600
+    ),
+    "llama-3.1-8b-instant": PromptBudget(
+        context_window=131072, max_output_tokens=2048,
+        system=800, collaboration=400, local_docs=1000, web=500
+    ),
+}
+
+DEFAULT_BUDGET = PromptBudget(
+    context_window=8192, max_output_tokens=1024,
+    system=800, collaboration=400, local_docs=1000, web=500
+)
+
+# Sections whose unused budget is passed on to the next one
+ROLLOVER_ORDER = ["collaboration", "local_docs", "web"]
+
+# A document cut shorter than this is dropped rather than included as a stub
+MIN_PARTIAL_DOCUMENT_TOKENS = 50
+
+
+def budget_for_model(model: str) -> PromptBudget:
+    return MODEL_BUDGETS.get(model, DEFAULT_BUDGET)
+
+
+class PromptBuilder:
+    """Fits prompt sections to a model's token budgets and records their sizes.
+
+    Each fitted section is cut at a token boundary to its budget. Budget left
+    unused by the collaboration context is added to the local documents, and
+    budget left by the documents is added to the web results, so a short
+    section does not waste space a later one could use.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.budget = budget_for_model(model)
+        self.token_counts: Dict[str, int] = {}
+        self._spare = 0
+
+    def _available(self, section: str) -> int:
+        available = getattr(self.budget, section)
+        if section in ROLLOVER_ORDER:
+            available += self._spare
+        return available
+
+    def _consume(self, section: str, available: int, used: int):
+        self.token_counts[section] = self.token_counts.get(section, 0) + used
+        if section in ROLLOVER_ORDER:
+            self._spare = max(0, available - used)
+
+    def fit(self, section: str, text: str, overhead: int = 0) -> str:
+        """Cut text to the section's budget, less `overhead` tokens of fixed wrapper text"""
+        available = self._available(section)
+        fitted = truncate_to_tokens(text or "", available - overhead)
+        used = count_tokens(fitted) + (overhead if fitted else 0)
+        self._consume(section, available, used)
+        return fitted
+
+    def fit_documents(self, section: str, texts: Iterable[str], separator: str = "\n\n") -> str:
+        """Join whole documents while they fit, then as much of the next one as is worthwhile"""
+        available = self._available(section)
+        remaining = available
+        separator_tokens = count_tokens(separator)
+        parts = []
+        for text in texts:
+            if not text:
+                continue
+            cost = count_tokens(text) + (separator_tokens if parts else 0)
+            if cost <= remaining:
+                parts.append(text)
+                remaining -= cost
+                continue
+            room = remaining - (separator_tokens if parts else 0)
+            if room >= MIN_PARTIAL_DOCUMENT_TOKENS:
+                parts.append(truncate_to_tokens(text, room))
+            break
+        joined = separator.join(parts)
+        self._consume(section, available, count_tokens(joined))
+        return joined
+
+    def record(self, section: str, text: str):
+        """Count a section that is never truncated (e.g. the user query)"""
+        self.token_counts[section] = self.token_counts.get(section, 0) + count_tokens(text)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.token_counts.values())
+
+    def fits(self) -> bool:
+        """Whether the prompt leaves room for the response within the context window"""
+        return self.total_tokens + self.budget.max_output_tokens <= self.budget.context_window
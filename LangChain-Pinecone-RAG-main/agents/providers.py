@@ -0,0 +1,50 @@
+"""
+Providers - Interfaces for the services an agent depends on, and the Pinecone adapter
+"""
+
+from typing import Any, List, Protocol, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+
+class ChatModel(Protocol):
+    """Chat LLM: takes messages, returns a message with `content` and `usage_metadata`"""
+
+    def invoke(self, messages: List[Any], **kwargs) -> Any:
+        ...
+
+
+class VectorIndex(Protocol):
+    """Vector search over the knowledge base"""
+
+    def search(self, embedding: Sequence[float], k: int) -> List[Tuple[Document, float]]:
+        """Top k documents with relevance scores in [0, 1], best first"""
+        ...
+
+    def version(self) -> str:
+        """Identifier that changes when the indexed documents change"""
+        ...
+
+
+class WebSearch(Protocol):
+    """Web search returning result snippets as text"""
+
+    def run(self, query: str) -> str:
+        ...
+
+
+class PineconeIndex:
+    """VectorIndex backed by a Pinecone index through LangChain's PineconeVectorStore"""
+
+    def __init__(self, vector_store: Any, index: Any):
+        self.vector_store = vector_store
+        self.index = index
+        self._relevance = vector_store._select_relevance_score_fn()
+
+    def search(self, embedding: Sequence[float], k: int) -> List[Tuple[Document, float]]:
+        results = self.vector_store.similarity_search_by_vector_with_score(list(embedding), k=k)
+        return [(doc, self._relevance(score)) for doc, score in results]
+
+    def version(self) -> str:
+        stats = self.index.describe_index_stats()
+        return str(getattr(stats, "total_vector_count", 0))
@@ -0,0 +1,37 @@
+"""
+Query Plan - Everything derived from a user query, computed once per request
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class QueryPlan:
+    """Routing decision, preferences and embedding for one request.
+
+    Built once by the coordinator and handed to every selected agent, so agents
+    do not re-extract destinations or preferences or re-check their relevance.
+    """
+    query: str
+    sanitized_query: str
+    selected_agents: List[str]
+    is_itinerary: bool
+    agent_scores: Dict[str, float] = field(default_factory=dict)
+    destination: Optional[str] = None
+    query_embedding: Optional[List[float]] = None
+    routing_cached: bool = False
+
+    # Food preferences
+    is_vegetarian: bool = False
+    is_vegan: bool = False
+    allergies: List[str] = field(default_factory=list)
+    meal_type: str = "any"
+    food_budget: str = "medium"
+
+    # Activity preferences
+    activity_types: List[str] = field(default_factory=list)
+    activity_budget: str = "medium"
+
+    # Language preferences (target_language, context, formality)
+    language_preferences: Dict[str, str] = field(default_factory=dict)
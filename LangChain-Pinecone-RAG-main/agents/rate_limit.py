@@ -0,0 +1,223 @@
+"""
+Rate Limiting - Process-wide request/token buckets, concurrency cap and retries for LLM calls
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from .budget import Deadline, DeadlineExceeded
+from .structured_log import log_event
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: rate limited, or a transient server error
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError"}
+
+# Expected completion size, charged up front and corrected once usage is known
+OUTPUT_TOKEN_ESTIMATE = 400
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` per second up to `capacity`.
+
+    `reserve` takes the amount immediately, letting the level go negative, and
+    returns how long the caller must wait for that debt to be repaid. Callers
+    queue up fairly without holding a lock while they sleep.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` and return the seconds to wait before using it"""
+        with self._lock:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+            return max(0.0, -self._level / self.rate)
+
+    def refund(self, amount: float):
+        """Give back a reservation; like `reserve`, amounts over capacity count as capacity"""
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level + min(amount, self.capacity))
+
+
+class RateLimiter:
+    """Shared limits for one model: requests per minute, tokens per minute and concurrent calls"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, max_concurrent: int):
+        self.requests = TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute / 6.0))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+
+    def block_for(self, seconds: float):
+        """Pause every caller after the provider reports a rate limit"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.rate_limited += 1
+
+    def acquire(self, estimated_tokens: int, deadline: Optional[Deadline] = None):
+        """Wait for request and token capacity plus a free slot, within the deadline"""
+        wait = max(
+            self.requests.reserve(1),
+            self.tokens.reserve(estimated_tokens),
+            self._blocked_until - time.monotonic(),
+        )
+        if deadline and wait > deadline.remaining():
+            self.requests.refund(1)
+            self.tokens.refund(estimated_tokens)
+            raise DeadlineExceeded(f"rate limit wait of {wait:.1f}s exceeds the deadline")
+        if wait > 0:
+            time.sleep(wait)
+        timeout = deadline.remaining() if deadline else None
+        if not self._slots.acquire(timeout=timeout):
+            # The call never happens, so give back what it reserved
+            self.requests.refund(1)
+            self.tokens.refund(estimated_tokens)
+            raise DeadlineExceeded("no free LLM slot before the deadline")
+        with self._lock:
+            self.calls += 1
+            self.wait_seconds += wait
+
+    def release(self, estimated_tokens: int, actual_tokens: Optional[int] = None):
+        """Free the slot and settle the token estimate against actual usage"""
+        self._slots.release()
+        if actual_tokens is not None:
+            difference = estimated_tokens - actual_tokens
+            if difference > 0:
+                self.tokens.refund(difference)
+            elif difference < 0:
+                self.tokens.reserve(-difference)
+
+    def note_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "wait_seconds": round(self.wait_seconds, 2),
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """The process-wide limiter for a model (Groq limits are per model)"""
+    with _limiters_lock:
+        if model not in _limiters:
+            _limiters[model] = RateLimiter(
+                requests_per_minute=float(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "30")),
+                tokens_per_minute=float(os.environ.get("GROQ_TOKENS_PER_MINUTE", "12000")),
+                max_concurrent=int(os.environ.get("LLM_MAX_CONCURRENCY", "4")),
+            )
+        return _limiters[model]
+
+
+def set_rate_limiter(model: str, limiter: RateLimiter):
+    """Replace the limiter for a model (e.g. generous limits for offline load tests)"""
+    with _limiters_lock:
+        _limiters[model] = limiter
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error: Exception) -> bool:
+    return _status_code(error) in RETRYABLE_STATUSES or type(error).__name__ in RETRYABLE_ERRORS
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the provider's Retry-After (or retry-after-ms) header"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 20.0) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def call_with_retries(
+    call: Callable[[Dict[str, Any]], Any],
+    limiter: RateLimiter,
+    estimated_tokens: int,
+    deadline: Optional[Deadline] = None,
+    max_retries: int = 3,
+    usage_fn: Optional[Callable[[Any], int]] = None,
+) -> Any:
+    """Run `call` under the limiter, retrying rate limits and transient errors.
+
+    `call` receives the keyword arguments for this attempt (a `timeout` set to
+    what is left of the deadline). Retries wait for Retry-After when the
+    provider sends it, otherwise for a jittered exponential backoff, and stop
+    when the wait would overrun the deadline; the last error is then raised.
+    """
+    attempt = 0
+    while True:
+        limiter.acquire(estimated_tokens, deadline)
+        actual_tokens = None
+        try:
+            kwargs = {"timeout": deadline.remaining()} if deadline else {}
+            result = call(kwargs)
+            if usage_fn is not None:
+                actual_tokens = usage_fn(result) or None
+            return result
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            retry_after = retry_after_seconds(e)
+            if retry_after is not None:
+                limiter.block_for(retry_after)
+                delay = retry_after + random.uniform(0, 0.5)
+            else:
+                delay = backoff_delay(attempt)
+            if deadline and delay >= deadline.remaining():
+                raise
+            log_event(logger, logging.WARNING, "llm_retry", sampled=True, error_type=type(e).__name__, attempt=attempt, delay_s=round(delay, 2))
+        finally:
+            limiter.release(estimated_tokens, actual_tokens)
+        limiter.note_retry()
+        time.sleep(delay)
+        attempt += 1
@@ -0,0 +1,177 @@
+"""
+Semantic Response Cache - Reuses LLM answers for near-identical questions
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .structured_log import log_event
+
+logger = logging.getLogger(__name__)
+
+
+def document_ids(docs: Sequence[Any]) -> Tuple[str, ...]:
+    """Stable, order-independent identifiers for retrieved documents"""
+    ids = []
+    for doc in docs:
+        doc_id = getattr(doc, "id", None) or (getattr(doc, "metadata", {}) or {}).get("id")
+        if not doc_id:
+            doc_id = hashlib.sha1(getattr(doc, "page_content", "").encode("utf-8")).hexdigest()
+        ids.append(str(doc_id))
+    return tuple(sorted(ids))
+
+
+class SemanticResponseCache:
+    """Answers keyed by agent, retrieved documents and collaboration context, matched by embedding.
+
+    A stored answer is reused when a new request for the same agent, with the
+    same retrieved document IDs and the same collaboration context, has a query
+    embedding whose cosine similarity to the stored one is at least
+    `similarity_threshold`. Entries expire after `ttl_seconds`, the least
+    recently used entries are evicted beyond `max_entries`, and everything is
+    dropped when the index version reported by `version_fn` changes.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 512,
+        version_fn: Optional[Callable[[], str]] = None,
+        version_check_interval: float = 300,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version_fn = version_fn
+        self.version_check_interval = version_check_interval
+
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[Hashable, Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._index_version: Optional[str] = None
+        self._version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _bucket(agent_name: str, doc_ids: Sequence[str], collaboration_context: Optional[str]) -> Hashable:
+        context_hash = hashlib.sha1((collaboration_context or "").encode("utf-8")).hexdigest()
+        return agent_name, tuple(doc_ids), context_hash
+
+    @staticmethod
+    def _unit(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _check_index_version(self):
+        """Drop every entry if the index changed since the last check"""
+        if self.version_fn is None:
+            return
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        try:
+            version = self.version_fn()
+        except Exception as e:
+            log_event(logger, logging.WARNING, "index_version_failed", error=str(e))
+            return
+        self.set_index_version(version)
+
+    def set_index_version(self, version: str):
+        """Record the current index version, invalidating the cache if it changed"""
+        with self._lock:
+            if self._index_version is not None and version != self._index_version:
+                self._clear_locked()
+                self.invalidations += 1
+            self._index_version = version
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _remove_locked(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is not None:
+            bucket = self._buckets.get(entry["bucket"])
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[entry["bucket"]]
+
+    def lookup(
+        self,
+        agent_name: str,
+        doc_ids: Sequence[str],
+        collaboration_context: Optional[str],
+        embedding: Sequence[float],
+    ) -> Optional[Dict[str, Any]]:
+        """Return a stored response for a semantically equivalent request, if any"""
+        self._check_index_version()
+        bucket = self._bucket(agent_name, doc_ids, collaboration_context)
+        vector = self._unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_similarity = None, self.similarity_threshold
+            for entry_id in list(self._buckets.get(bucket, ())):
+                entry = self._entries[entry_id]
+                if now - entry["created_at"] > self.ttl_seconds:
+                    self._remove_locked(entry_id)
+                    continue
+                similarity = float(entry["vector"] @ vector)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return dict(self._entries[best_id]["response"])
+
+    def store(
+        self,
+        agent_name: str,
+        doc_ids: Sequence[str],
+        collaboration_context: Optional[str],
+        embedding: Sequence[float],
+        response: Dict[str, Any],
+    ):
+        """Remember a freshly generated response"""
+        bucket = self._bucket(agent_name, doc_ids, collaboration_context)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "bucket": bucket,
+                "vector": self._unit(embedding),
+                "response": dict(response),
+                "created_at": time.monotonic(),
+            }
+            self._buckets.setdefault(bucket, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.max_entries,
+                "invalidations": self.invalidations,
+            }
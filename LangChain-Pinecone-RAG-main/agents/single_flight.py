@@ -0,0 +1,69 @@
+"""
+Single Flight - Concurrent identical requests share one computation
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs a function at most once at a time per key.
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it is running wait for it and receive the same result (or
+    exception). Nothing is kept once the call finishes, so this deduplicates
+    only in-flight work and never serves stale results.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return fn's result and whether it was shared from another caller's run"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.followers += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, Any]:
+        """Shared results counted as hits, computed ones as misses"""
+        with self._lock:
+            total = self.leaders + self.followers
+            return {
+                "hits": self.followers,
+                "misses": self.leaders,
+                "hit_rate": self.followers / total if total else 0.0,
+                "in_flight": len(self._calls),
+            }
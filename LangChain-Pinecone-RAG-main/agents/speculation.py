@@ -0,0 +1,105 @@
+"""
+Speculative Web Search - Start web search alongside retrieval when the local corpus will likely miss
+"""
+
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .query_plan import QueryPlan
+
+# Places covered by the ingested knowledge base (ingestion.create_travel_documents and the Vietnam PDFs)
+CORPUS_DESTINATIONS = [
+    "tokyo", "japan", "paris", "france", "rome", "italy", "bangkok", "thailand",
+    "new york", "ho chi minh", "saigon", "hanoi", "hoi an", "vietnam",
+]
+
+# Speculate for queries without a known destination once this share of recent retrievals missed
+MISS_RATE_THRESHOLD = 0.5
+
+# Web searches run on their own pool so agents waiting on them cannot starve it
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_executor_lock = threading.Lock()
+
+
+def search_executor() -> ThreadPoolExecutor:
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is None:
+            _search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="web-search")
+        return _search_executor
+
+
+def covered_by_corpus(destination: str) -> bool:
+    destination = destination.lower()
+    return any(place in destination for place in CORPUS_DESTINATIONS)
+
+
+def names_place(destination: str, query: str) -> bool:
+    """Whether the plan's destination is a place name rather than a capitalized ordinary word.
+
+    Destination extraction falls back to any capitalized word, so a query
+    without a place yields e.g. "How" or "I". Corpus places always count;
+    otherwise the word must be capitalized somewhere other than the start of
+    a sentence, where capitals mark proper nouns.
+    """
+    if covered_by_corpus(destination):
+        return True
+    if not destination[:1].isupper() or destination == "I":
+        return False
+    pattern = re.compile(rf"\b{re.escape(destination)}\b")
+    for sentence in re.split(r"(?<=[.!?])\s+", query):
+        sentence = sentence.lstrip("\"'(¿¡ ")
+        if any(match.start() > 0 for match in pattern.finditer(sentence)):
+            return True
+    return False
+
+
+class RetrievalMissTracker:
+    """Recent retrieval outcomes, and how speculative searches turned out"""
+
+    def __init__(self, window: int = 50):
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.speculated = 0
+        self.used = 0
+        self.discarded = 0
+
+    def record_retrieval(self, missed: bool):
+        with self._lock:
+            self._outcomes.append(missed)
+
+    @property
+    def miss_rate(self) -> float:
+        with self._lock:
+            return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def predict_miss(self, plan: Optional[QueryPlan]) -> bool:
+        """Whether retrieval for this request will probably return too little context"""
+        if plan is not None and plan.destination and names_place(plan.destination, plan.sanitized_query):
+            return not covered_by_corpus(plan.destination)
+        return self.miss_rate >= MISS_RATE_THRESHOLD
+
+    def record_speculation(self, used: Optional[bool] = None):
+        """Count a started speculative search (used=None) or its outcome"""
+        with self._lock:
+            if used is None:
+                self.speculated += 1
+            elif used:
+                self.used += 1
+            else:
+                self.discarded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Used speculative searches counted as hits, discarded ones as misses"""
+        with self._lock:
+            resolved = self.used + self.discarded
+            return {
+                "hits": self.used,
+                "misses": self.discarded,
+                "hit_rate": self.used / resolved if resolved else 0.0,
+                "started": self.speculated,
+                "retrieval_miss_rate": sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0,
+            }
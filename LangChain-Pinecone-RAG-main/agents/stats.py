@@ -0,0 +1,30 @@
+"""
+Statistics Helpers - Latency percentiles shared by the batch runner, benchmarks and load tests
+"""
+
+import statistics
+from typing import Dict, Iterable
+
+
+def percentile(sorted_values, q: float) -> float:
+    """q-th percentile (0-100) of already sorted values, by linear interpolation"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def latency_summary(latencies: Iterable[float]) -> Dict[str, float]:
+    """Mean, p50, p95, p99 and max of a set of latencies"""
+    values = sorted(latencies)
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": statistics.mean(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+    }
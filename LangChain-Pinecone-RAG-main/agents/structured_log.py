@@ -0,0 +1,156 @@
+"""
+Structured Logging - JSON-lines events with request/session IDs, sampling and a non-blocking handler
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional
+
+ROOT_LOGGER = "agents"
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_session_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("session_id", default=None)
+
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_sample_rate = 1.0
+
+# Attributes every LogRecord has; anything else was passed as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None, session_id: Optional[str] = None) -> Iterator[str]:
+    """Tag every event logged in this block (and in workers started via in_current_context)"""
+    request_id = request_id or new_request_id()
+    request_token = _request_id.set(request_id)
+    session_token = _session_id.set(session_id) if session_id is not None else None
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(request_token)
+        if session_token is not None:
+            _session_id.reset(session_token)
+
+
+def _sampled_in() -> bool:
+    """Keep or drop all of a request's sampled events together, so kept requests read end to end"""
+    if _sample_rate >= 1.0:
+        return True
+    request_id = _request_id.get()
+    if request_id is None:
+        return random.random() < _sample_rate
+    return zlib.crc32(request_id.encode()) / 0xFFFFFFFF < _sample_rate
+
+
+def log_event(logger: logging.Logger, level: int, event: str, sampled: bool = False, exc_info: bool = False, **fields: Any):
+    """Log event with fields; sampled=True marks high-volume events subject to LOG_SAMPLE_RATE"""
+    if not logger.isEnabledFor(level):
+        return
+    if sampled:
+        if not _sampled_in():
+            return
+        if _sample_rate < 1.0:
+            fields["sample_rate"] = _sample_rate
+    logger.log(level, event, exc_info=exc_info, extra=fields)
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the caller's request and session IDs before they cross to the writer thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        record.session_id = _session_id.get()
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread with the message and traceback rendered but not yet formatted"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, event, request/session IDs, then the event's fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "session_id": getattr(record, "session_id", None),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info or record.exc_text:
+            entry["exception"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable variant for local development"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(
+            f"{key}={value}" for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES and key not in ("request_id", "session_id")
+        )
+        request_id = getattr(record, "request_id", None) or "-"
+        line = f"{self.formatTime(record)} {record.levelname:<7} [{request_id}] {record.name}: {record.getMessage()} {fields}".rstrip()
+        if record.exc_info or record.exc_text:
+            line += "\n" + (record.exc_text or self.formatException(record.exc_info))
+        return line
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json", sample_rate: float = 1.0, path: Optional[str] = None):
+    """Route the agents' logs through a queue to a stderr (or file) writer thread; later calls are no-ops"""
+    global _listener, _sample_rate
+    with _configure_lock:
+        if _listener is not None:
+            return
+        _sample_rate = max(0.0, min(1.0, sample_rate))
+        handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stderr)
+        handler.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(level.upper())
+        logger.addHandler(queue_handler)
+        logger.propagate = False
@@ -0,0 +1,51 @@
+"""
+Token Counting - Approximate token counts used for prompt budgets
+"""
+
+import threading
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_encoding = None
+_encoding_unavailable = tiktoken is None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """Load the tiktoken encoding once; fall back to a heuristic if it is unavailable"""
+    global _encoding, _encoding_unavailable
+    if _encoding is None and not _encoding_unavailable:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_unavailable:
+                try:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    # No cached encoding and no network: use the heuristic
+                    _encoding_unavailable = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Approximate number of LLM tokens in text (cl100k, or ~4 characters per token)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text that fits in max_tokens, cut at a token boundary"""
+    if not text or max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        token_ids = encoding.encode(text, disallowed_special=())
+        if len(token_ids) <= max_tokens:
+            return text
+        return encoding.decode(token_ids[:max_tokens])
+    return text[:max_tokens * 4]
@@ -0,0 +1,152 @@
+"""
+Tracing - Request-scoped timing spans for each stage and agent, exportable as a Chrome trace
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .profiling import attach_current_thread
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span", default=None)
+
+
+class Span:
+    """One timed stage; attributes describe what happened (tier, model, tokens, cache hit...)"""
+
+    def __init__(self, span_id: int, name: str, parent_id: Optional[int], start: float, attributes: Dict[str, Any]):
+        self.span_id = span_id
+        self.name = name
+        self.parent_id = parent_id
+        self.start = start
+        self.end: Optional[float] = None
+        self.thread = threading.current_thread().name
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    """Stands in for a span when no trace is active"""
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """All spans recorded while handling one request, across worker threads"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _new_span(self, name: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Span:
+        with self._lock:
+            span = Span(next(self._ids), name, parent.span_id if parent else None, time.perf_counter(), attributes)
+            self.spans.append(span)
+            return span
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        """Spans in start order with times in milliseconds from the start of the request"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return [
+            {
+                "id": s.span_id,
+                "parent": s.parent_id,
+                "name": s.name,
+                "thread": s.thread,
+                "start_ms": round((s.start - self.origin) * 1000, 2),
+                "duration_ms": round(((s.end or time.perf_counter()) - s.start) * 1000, 2),
+                **({"attributes": s.attributes} if s.attributes else {}),
+            }
+            for s in spans
+        ]
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event format; open in chrome://tracing or ui.perfetto.dev for a waterfall"""
+        spans = self.to_dict()
+        lanes = {thread: tid for tid, thread in enumerate(dict.fromkeys(s["thread"] for s in spans), start=1)}
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread}}
+            for thread, tid in lanes.items()
+        ]
+        for s in spans:
+            events.append({
+                "name": s["name"],
+                "cat": s["name"].split(".")[0],
+                "ph": "X",
+                "pid": 1,
+                "tid": lanes[s["thread"]],
+                "ts": s["start_ms"] * 1000,
+                "dur": s["duration_ms"] * 1000,
+                "args": s.get("attributes", {}),
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"request": self.name}}
+
+    def write_chrome_trace(self, directory: str) -> str:
+        """Write this trace to a new file in directory and return its path"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        path = os.path.join(directory, f"trace-{stamp}-{id(self):x}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    """Make a new trace current for the enclosed request"""
+    trace = Trace(name)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """Time the enclosed block as a child of the current span (no-op outside a trace)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    current = trace._new_span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def in_current_context(fn):
+    """Wrap fn to run in a copy of the caller's context, so spans from worker threads join its trace
+    (and the worker thread joins the request's profile, if one is running)"""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        with attach_current_thread():
+            return fn(*args, **kwargs)
+
+    return lambda *args, **kwargs: context.run(run, *args, **kwargs)
@@ -0,0 +1,85 @@
+"""
+Usage Accounting - LLM tokens and cost per request, per agent and per session
+
+Calls that failed over to a canned answer are counted in failed_llm_calls,
+not llm_calls. When an agent misses its deadline the request is answered
+without it; a call it had in flight is cut off or finishes in the
+background, and whatever the provider billed for it is not counted here.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+# USD per million tokens (input, output) on Groq's on-demand pricing
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+
+def cost_usd(model: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    """List-price cost of one call's tokens; unknown models count as free"""
+    input_price, output_price = MODEL_PRICES.get(model or "", (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def usage_entry(
+    model: Optional[str], input_tokens: int, output_tokens: int, llm_calls: int = 1, failed_llm_calls: int = 0
+) -> Dict[str, Any]:
+    return {
+        "model": model,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "llm_calls": llm_calls,
+        "failed_llm_calls": failed_llm_calls,
+        "cost_usd": cost_usd(model, input_tokens, output_tokens),
+    }
+
+
+def failed_call_entry(model: Optional[str]) -> Dict[str, Any]:
+    """A call that raised before returning usage; providers bill nothing we can see"""
+    return usage_entry(model, 0, 0, llm_calls=0, failed_llm_calls=1)
+
+
+def empty_usage() -> Dict[str, Any]:
+    return {"input_tokens": 0, "output_tokens": 0, "llm_calls": 0, "failed_llm_calls": 0, "cost_usd": 0.0, "by_agent": {}}
+
+
+def _accumulate(total: Dict[str, Any], entry: Dict[str, Any]):
+    for key in ("input_tokens", "output_tokens", "llm_calls", "failed_llm_calls", "cost_usd"):
+        total[key] = total.get(key, 0) + entry.get(key, 0)
+
+
+def summarize_usage(entries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Request totals plus the per-agent entries they came from"""
+    usage = empty_usage()
+    for agent, entry in entries.items():
+        _accumulate(usage, entry)
+        usage["by_agent"][agent] = entry
+    return usage
+
+
+def usage_from_responses(responses: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Usage of agent responses; cached and timed-out answers are not counted, fallbacks count as failed calls"""
+    entries: Dict[str, Dict[str, Any]] = {}
+    for response in responses:
+        if "usage" not in response or response.get("cached"):
+            continue
+        if response.get("fallback"):
+            entry = failed_call_entry(response.get("model"))
+        else:
+            entry = usage_entry(
+                response.get("model"), response["usage"]["input_tokens"], response["usage"]["output_tokens"]
+            )
+        if response["agent"] in entries:
+            _accumulate(entry, entries[response["agent"]])
+        entries[response["agent"]] = entry
+    return summarize_usage(entries)
+
+
+def add_usage(total: Dict[str, Any], usage: Dict[str, Any]):
+    """Fold one request's usage into running totals (e.g. a Streamlit session's)"""
+    total["requests"] = total.get("requests", 0) + 1
+    _accumulate(total, usage)
+    by_agent = total.setdefault("by_agent", {})
+    for agent, entry in usage.get("by_agent", {}).items():
+        _accumulate(by_agent.setdefault(agent, {}), entry)
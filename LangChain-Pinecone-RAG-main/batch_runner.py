@@ -0,0 +1,197 @@
+"""
+Batch query runner: send a JSONL file of queries through AgentCoordinator.coordinate_response
+for regression checks and cache warming.
+
+Input lines are {"query": "...", "id": "..."} (id optional, defaults to the line number)
+or plain JSON strings. Each finished query is appended to the output immediately, so an
+interrupted run picks up where it stopped when started again with the same output file.
+Failed queries are retried on resume; a finished run rewrites the output with one record
+per query.
+
+Usage:
+    python batch_runner.py queries.jsonl --output results.jsonl [--concurrency 4]
+    python batch_runner.py queries.jsonl --output results.parquet --offline
+
+Parquet output needs pandas and pyarrow; progress is kept in <output>.progress.jsonl and
+converted once every query has run.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from agents.stats import latency_summary
+
+
+def load_queries(path):
+    """(id, query) pairs from a JSONL file"""
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if isinstance(row, str):
+                row = {"query": row}
+            queries.append((str(row.get("id", line_number)), row["query"]))
+    return queries
+
+
+def progress_path(output):
+    return output if output.endswith(".jsonl") else output + ".progress.jsonl"
+
+
+def load_progress(path):
+    """Records already written by an earlier, possibly interrupted, run"""
+    records = []
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line.decode("utf-8")))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    # A line cut off by an interrupted write, possibly mid-character; that query is run again
+                    continue
+    return records
+
+
+def terminate_last_line(path):
+    """End a line left incomplete by an interrupted run, so appended records start on their own line"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def run_query(coordinator, query_id, query, include_response):
+    start = time.perf_counter()
+    record = {"id": query_id, "query": query}
+    try:
+        result = coordinator.coordinate_response(query)
+        usage = result.get("usage", {})
+        record.update({
+            "ok": True,
+            "error": None,
+            "agents_used": result.get("agents_used", []),
+            "fused": result.get("fused", False),
+            "coalesced": result.get("coalesced", False),
+            "routing_cache_hit": result.get("routing_cache_hit", False),
+            "timed_out_agents": result.get("timed_out_agents", []),
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+            "llm_calls": usage.get("llm_calls", 0),
+            "failed_llm_calls": usage.get("failed_llm_calls", 0),
+            "cost_usd": usage.get("cost_usd", 0.0),
+        })
+        if include_response:
+            record["response"] = result.get("response", "")
+    except Exception as e:
+        record.update({"ok": False, "error": f"{type(e).__name__}: {e}"})
+    record["latency_s"] = time.perf_counter() - start
+    return record
+
+
+def summarize(records, wall_seconds):
+    succeeded = [r for r in records if r.get("ok")]
+    return {
+        "queries": len(records),
+        "succeeded": len(succeeded),
+        "failed": len(records) - len(succeeded),
+        "wall_seconds": wall_seconds,
+        "throughput_qps": len(records) / wall_seconds if wall_seconds else 0.0,
+        "latency_s": latency_summary(r["latency_s"] for r in succeeded),
+        "input_tokens": sum(r.get("input_tokens", 0) for r in succeeded),
+        "output_tokens": sum(r.get("output_tokens", 0) for r in succeeded),
+        "llm_calls": sum(r.get("llm_calls", 0) for r in succeeded),
+        "failed_llm_calls": sum(r.get("failed_llm_calls", 0) for r in succeeded),
+        "cost_usd": sum(r.get("cost_usd", 0.0) for r in succeeded),
+    }
+
+
+def write_jsonl(records, output):
+    """Replace the output atomically, so an interrupted rewrite leaves the progress intact"""
+    temporary = f"{output}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(temporary, output)
+
+
+def write_parquet(records, output):
+    try:
+        import pandas as pd
+    except ImportError:
+        raise SystemExit("Parquet output needs pandas and pyarrow: pip install pandas pyarrow")
+    pd.DataFrame.from_records(records).to_parquet(output, index=False)
+
+
+def build_coordinator(offline):
+    if offline:
+        from agents.offline import build_offline_coordinator
+        return build_offline_coordinator(configure_logs=True)
+    from agents import AgentCoordinator
+    return AgentCoordinator()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of queries")
+    parser.add_argument("--output", required=True, help="Results file (.jsonl or .parquet)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Queries in flight at once")
+    parser.add_argument("--offline", action="store_true", help="Use the offline stand-ins instead of Groq/Pinecone")
+    parser.add_argument("--include-response", action="store_true", help="Store the answer text in each record")
+    parser.add_argument("--summary", help="Also write the summary JSON to this file")
+    args = parser.parse_args()
+
+    queries = load_queries(args.input)
+    progress_file = progress_path(args.output)
+    # Failed queries are retried on resume
+    previous = [r for r in load_progress(progress_file) if r.get("ok")]
+    done_ids = {r["id"] for r in previous}
+    pending = [(query_id, query) for query_id, query in queries if query_id not in done_ids]
+    print(f"{len(queries)} queries, {len(done_ids)} already done, {len(pending)} to run", file=sys.stderr)
+
+    coordinator = build_coordinator(args.offline)
+    records = []
+    start = time.perf_counter()
+    terminate_last_line(progress_file)
+    with open(progress_file, "a", encoding="utf-8") as out, ThreadPoolExecutor(args.concurrency) as pool:
+        futures = [
+            pool.submit(run_query, coordinator, query_id, query, args.include_response)
+            for query_id, query in pending
+        ]
+        for count, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            records.append(record)
+            if count % 50 == 0 or count == len(futures):
+                print(f"  {count}/{len(futures)} done", file=sys.stderr)
+    wall_seconds = time.perf_counter() - start
+
+    # Every query now has one record: kept from an earlier run or from this one (failures retried)
+    if args.output.endswith(".parquet"):
+        write_parquet(previous + records, args.output)
+    else:
+        # The .jsonl output is also the progress file, which still holds the retried failures
+        write_jsonl(previous + records, args.output)
+
+    # Throughput and latency describe this run; earlier runs are only counted for completeness
+    summary = summarize(records, wall_seconds)
+    summary["previously_completed"] = len(previous)
+    print(json.dumps(summary, indent=2))
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
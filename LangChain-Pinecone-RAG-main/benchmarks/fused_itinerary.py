@@ -0,0 +1,107 @@
+"""
+Benchmark the fused single-call itinerary mode against the per-agent path:
+latency, prompt/completion tokens, LLM calls and estimated cost per query.
+
+Usage:
+    python benchmarks/fused_itinerary.py [--repeat 3] [--json results.json]
+
+Needs the same .env as the app; every run makes real Groq calls.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every run must make its own LLM calls: a cached answer would count as 0 tokens
+# and near-zero latency, and the fused run would reuse the multi-call run's work
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+os.environ.setdefault("WEB_CACHE_SIZE", "0")
+os.environ.setdefault("ROUTING_CACHE_SIZE", "0")
+
+from agents import AgentCoordinator  # noqa: E402
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "routing_queries.jsonl")
+
+
+def load_itinerary_queries(path):
+    """Queries labelled with all four agents are the itinerary queries"""
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [row["query"] for row in rows if len(row["agents"]) == 4]
+
+
+def run_mode(coordinator, queries, fused, repeat):
+    coordinator.fused_itinerary = fused
+    records = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            result = coordinator.coordinate_response(query)
+            latency = time.perf_counter() - start
+            usage = result.get("usage", {})
+            records.append({
+                "query": query,
+                "fused": result.get("fused", False),
+                "latency_s": latency,
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0),
+                "llm_calls": usage.get("llm_calls", 0),
+                "cost_usd": usage.get("cost_usd", 0.0),
+            })
+    return records
+
+
+def summarize(name, records):
+    latencies = sorted(r["latency_s"] for r in records)
+    return {
+        "mode": name,
+        "runs": len(records),
+        "fused_runs": sum(r["fused"] for r in records),
+        "latency_s_mean": statistics.mean(latencies),
+        "latency_s_p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "input_tokens_mean": statistics.mean(r["input_tokens"] for r in records),
+        "output_tokens_mean": statistics.mean(r["output_tokens"] for r in records),
+        "llm_calls_mean": statistics.mean(r["llm_calls"] for r in records),
+        "cost_usd_per_query": statistics.mean(r["cost_usd"] for r in records),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="JSONL file of {query, agents}")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per query and mode")
+    parser.add_argument("--json", help="Write per-run records and summaries to this file")
+    args = parser.parse_args()
+
+    queries = load_itinerary_queries(args.data)
+    coordinator = AgentCoordinator()
+
+    multi = run_mode(coordinator, queries, fused=False, repeat=args.repeat)
+    fused = run_mode(coordinator, queries, fused=True, repeat=args.repeat)
+    summaries = [summarize("multi-call", multi), summarize("fused", fused)]
+
+    header = f"{'mode':<11} {'runs':>5} {'mean s':>7} {'p95 s':>7} {'in tok':>8} {'out tok':>8} {'calls':>6} {'$/query':>9}"
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        print(
+            f"{s['mode']:<11} {s['runs']:>5} {s['latency_s_mean']:>7.2f} {s['latency_s_p95']:>7.2f} "
+            f"{s['input_tokens_mean']:>8.0f} {s['output_tokens_mean']:>8.0f} {s['llm_calls_mean']:>6.1f} "
+            f"{s['cost_usd_per_query']:>9.5f}"
+        )
+    if summaries[1]["fused_runs"] < summaries[1]["runs"]:
+        skipped = summaries[1]["runs"] - summaries[1]["fused_runs"]
+        print(f"\nNote: {skipped} fused-mode runs used the per-agent path (not routed as an itinerary, or the fused call failed)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summaries": summaries, "multi_call": multi, "fused": fused}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Microbenchmarks for the routing, preference extraction and retrieval hot paths,
+plus end-to-end coordinate_response, all against the offline stand-ins.
+
+The LLM and web search stand-ins answer almost instantly, so the end-to-end
+numbers measure the application's own overhead (planning, prompt building,
+tracing, combining) rather than Groq or DuckDuckGo. Caches are cleared before
+every pass, so each pass sees every query cold.
+
+Usage:
+    python benchmarks/hot_paths.py [--repeat 5] [--json results.json]
+    python benchmarks/hot_paths.py --baseline results.json [--tolerance 0.25]
+
+With --baseline, each benchmark's median is compared to the stored run and the
+script exits with status 1 if any got slower by more than the tolerance.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Measure the code paths, not cached answers or the on-disk web cache
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+os.environ.setdefault("WEB_CACHE_SIZE", "0")
+# Routing and fallback events are logged at INFO; keep the report readable
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from agents.offline import CannedWebSearch, FakeChatModel, build_offline_coordinator  # noqa: E402
+from agents.stats import latency_summary  # noqa: E402
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "routing_queries.jsonl")
+
+
+def load_queries(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["query"] for line in f if line.strip()]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def clear_caches(coordinator):
+    coordinator.routing_cache.clear()
+    coordinator.keyword_matcher.cache.clear()
+
+
+def time_calls(fn, inputs, repeat, before_pass):
+    """Latency of every call in microseconds, over `repeat` passes through the inputs"""
+    latencies = []
+    for _ in range(repeat):
+        before_pass()
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def run_benchmarks(coordinator, queries, repeat):
+    food = coordinator.agents["food"]
+    language = coordinator.agents["language"]
+    culture = coordinator.agents["culture"]
+    embeddings = {query: coordinator.embeddings.embed_query(query) for query in queries}
+    reset = lambda: clear_caches(coordinator)  # noqa: E731
+
+    benchmarks = {
+        "analyze_query": lambda q: coordinator.analyze_query(q),
+        "select_agents": lambda q: coordinator.select_agents(q),
+        "extract_destination": lambda q: culture.extract_destination(q),
+        "food.extract_dietary_preferences": lambda q: food.extract_dietary_preferences(q),
+        "language.extract_language_preferences": lambda q: language.extract_language_preferences(q),
+        # The coordinator passes the plan's embedding, so retrieval is search plus local thresholds
+        "retrieve_context": lambda q: culture.retrieve_context(q, embeddings[q]),
+        "coordinate_response": lambda q: coordinator.coordinate_response(q),
+    }
+
+    # Warm up once so imports and first-call setup are not measured
+    for fn in benchmarks.values():
+        fn(queries[0])
+
+    results = {}
+    for name, fn in benchmarks.items():
+        latencies = time_calls(fn, queries, repeat, reset)
+        results[name] = {"unit": "us", "calls": len(latencies), **latency_summary(latencies)}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Median ratio to the baseline per benchmark; returns the names that regressed"""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('created', '?')} (commit {baseline.get('commit')})\n")
+    header = f"{'benchmark':<40} {'baseline p50':>13} {'p50':>10} {'ratio':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, current in results.items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous.get("p50"):
+            print(f"{name:<40} {'-':>13} {current['p50']:>10.1f} {'new':>7}")
+            continue
+        ratio = current["p50"] / previous["p50"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {previous['p50']:>13.1f} {current['p50']:>10.1f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="JSONL file of {query, ...}")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the queries per benchmark")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown before flagging (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    queries = load_queries(args.data)
+    coordinator = build_offline_coordinator(
+        llm=FakeChatModel(time_to_first_token=0.001, tokens_per_second=1e6, tokens_per_second_sd=0),
+        small_llm=FakeChatModel(time_to_first_token=0.001, tokens_per_second=1e6, tokens_per_second_sd=0),
+        web_search_tool=CannedWebSearch(latency=0.0),
+    )
+    results = run_benchmarks(coordinator, queries, args.repeat)
+
+    print(f"\n{len(queries)} queries x {args.repeat} passes (microseconds per call)\n")
+    header = f"{'benchmark':<40} {'mean':>10} {'p50':>10} {'p95':>10} {'p99':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<40} {r['mean']:>10.1f} {r['p50']:>10.1f} {r['p95']:>10.1f} {r['p99']:>10.1f}")
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "queries": len(queries),
+        "repeat": args.repeat,
+        "benchmarks": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
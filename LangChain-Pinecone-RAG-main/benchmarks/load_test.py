@@ -0,0 +1,212 @@
+"""
+Load test: simulated users share one AgentCoordinator (as st.cache_resource does in
+multi_agent_app.py) while concurrency ramps up, to find where throughput stops scaling.
+
+Each user loops: pick an itinerary or single-agent question from the labelled set, or
+click one of the follow-up suggestions offered after their previous answer, then
+think for a while. Apart from a share of popular questions asked verbatim, labelled
+questions are asked about a random city, so caches see a realistic number of misses. Everything runs against the offline stand-ins, whose LLM sleeps
+like the hosted model, so no API keys are needed.
+
+Usage:
+    python benchmarks/load_test.py [--ramp 1,2,4,8,16] [--duration 30] [--mix 30,50,20]
+    python benchmarks/load_test.py --rpm 30 --tpm 12000 --json load.json
+
+--rpm/--tpm apply Groq-like quotas to the simulated LLM (default: unlimited).
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Per-request INFO events would drown the report; deadline misses and errors still show
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from agents.offline import build_offline_coordinator  # noqa: E402
+from agents.rate_limit import RateLimiter  # noqa: E402
+from agents.stats import latency_summary  # noqa: E402
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "routing_queries.jsonl")
+KINDS = ("itinerary", "single", "follow_up")
+# The travel guide cities plus destinations only web search knows about
+CITIES = [
+    "Hanoi", "Ho Chi Minh City", "Hoi An", "Tokyo", "Paris", "Rome", "Bangkok", "New York",
+    "Kyoto", "Seoul", "Lisbon", "Istanbul", "Marrakesh", "Mexico City", "Cusco", "Prague",
+]
+CITY_PATTERN = re.compile("|".join(re.escape(city) for city in sorted(CITIES, key=len, reverse=True)))
+
+
+def load_query_pools(path):
+    """Itinerary queries (all four agents) and single-agent queries from the labelled set"""
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return {
+        "itinerary": [row["query"] for row in rows if len(row["agents"]) == 4],
+        "single": [row["query"] for row in rows if len(row["agents"]) == 1],
+    }
+
+
+def about_random_city(query, rng):
+    """The same question about a randomly chosen city"""
+    city = rng.choice(CITIES)
+    if CITY_PATTERN.search(query):
+        return CITY_PATTERN.sub(city, query, count=1)
+    return f"{query.rstrip('?. ')} in {city}?"
+
+
+class User(threading.Thread):
+    """One simulated session sending requests until the stage ends"""
+
+    def __init__(self, user_id, coordinator, pools, mix, repeat_share, think_time, stop_at, records, lock):
+        super().__init__(name=f"user-{user_id}", daemon=True)
+        self.coordinator = coordinator
+        self.pools = pools
+        self.mix = mix
+        self.repeat_share = repeat_share
+        self.think_time = think_time
+        self.stop_at = stop_at
+        self.records = records
+        self.lock = lock
+        self.rng = random.Random(user_id)
+        self.suggestions = []
+
+    def next_query(self):
+        kind = self.rng.choices(KINDS, weights=self.mix)[0]
+        if kind == "follow_up" and not self.suggestions:
+            kind = "itinerary"
+        if kind == "follow_up":
+            return kind, self.rng.choice(self.suggestions)
+        query = self.rng.choice(self.pools[kind])
+        if self.rng.random() >= self.repeat_share:
+            query = about_random_city(query, self.rng)
+        return kind, query
+
+    def run(self):
+        while time.monotonic() < self.stop_at:
+            kind, query = self.next_query()
+            start = time.perf_counter()
+            record = {"kind": kind, "error": None, "partial": False}
+            try:
+                result = self.coordinator.coordinate_response(query)
+                record["partial"] = bool(result.get("timed_out_agents"))
+                record["coalesced"] = result.get("coalesced", False)
+                # The app only offers follow-ups after collaborative answers
+                if result.get("collaboration"):
+                    self.suggestions = self.coordinator.suggest_follow_up_questions(query, result["agents_used"])
+            except Exception as e:
+                record["error"] = type(e).__name__
+            record["latency_s"] = time.perf_counter() - start
+            with self.lock:
+                self.records.append(record)
+            if self.think_time:
+                time.sleep(self.rng.expovariate(1.0 / self.think_time))
+
+
+def run_stage(coordinator, pools, users, duration, mix, repeat_share, think_time, seed):
+    records, lock = [], threading.Lock()
+    stop_at = time.monotonic() + duration
+    threads = [
+        User(seed + i, coordinator, pools, mix, repeat_share, think_time, stop_at, records, lock)
+        for i in range(users)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - start
+
+    succeeded = [r for r in records if r["error"] is None]
+    return {
+        "users": users,
+        "requests": len(records),
+        "errors": len(records) - len(succeeded),
+        "error_types": dict(Counter(r["error"] for r in records if r["error"])),
+        "partial_answers": sum(r["partial"] for r in succeeded),
+        "coalesced": sum(r.get("coalesced", False) for r in succeeded),
+        "wall_seconds": wall_seconds,
+        "throughput_rps": len(succeeded) / wall_seconds if wall_seconds else 0.0,
+        "latency_s": latency_summary(r["latency_s"] for r in succeeded),
+        "latency_p50_by_kind": {
+            kind: latency_summary(r["latency_s"] for r in succeeded if r["kind"] == kind)["p50"]
+            for kind in KINDS
+        },
+    }
+
+
+def find_knee(stages, min_gain=0.1):
+    """Concurrency after which more users add less than min_gain throughput"""
+    for previous, current in zip(stages, stages[1:]):
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain):
+            return previous["users"]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="JSONL file of {query, agents}")
+    parser.add_argument("--ramp", default="1,2,4,8,16", help="Concurrent users per stage")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per stage")
+    parser.add_argument("--mix", default="30,50,20", help="Weights of itinerary,single-agent,follow-up requests")
+    parser.add_argument("--repeat-share", type=float, default=0.2, help="Share of questions asked verbatim rather than about a random city")
+    parser.add_argument("--think", type=float, default=2.0, help="Mean think time between a user's requests (s)")
+    parser.add_argument("--rpm", type=float, help="Simulated LLM requests-per-minute quota")
+    parser.add_argument("--tpm", type=float, help="Simulated LLM tokens-per-minute quota")
+    parser.add_argument("--reset-caches", action="store_true", help="Clear routing and response caches between stages")
+    parser.add_argument("--json", help="Write the stage results to this file")
+    args = parser.parse_args()
+
+    pools = load_query_pools(args.data)
+    mix = [float(weight) for weight in args.mix.split(",")]
+    ramp = [int(users) for users in args.ramp.split(",")]
+
+    rate_limiter = None
+    if args.rpm or args.tpm:
+        rate_limiter = RateLimiter(
+            requests_per_minute=args.rpm or 1e6,
+            tokens_per_minute=args.tpm or 1e9,
+            max_concurrent=int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+        )
+    coordinator = build_offline_coordinator(rate_limiter=rate_limiter, configure_logs=True)
+
+    stages = []
+    header = f"{'users':>6} {'reqs':>6} {'errors':>7} {'partial':>8} {'rps':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7}"
+    print(header)
+    print("-" * len(header))
+    for stage_number, users in enumerate(ramp):
+        if args.reset_caches:
+            coordinator.routing_cache.clear()
+            if coordinator.response_cache is not None:
+                coordinator.response_cache.clear()
+        stage = run_stage(
+            coordinator, pools, users, args.duration, mix, args.repeat_share, args.think, seed=stage_number * 1000
+        )
+        stages.append(stage)
+        latency = stage["latency_s"]
+        print(
+            f"{users:>6} {stage['requests']:>6} {stage['errors']:>7} {stage['partial_answers']:>8} "
+            f"{stage['throughput_rps']:>7.2f} {latency['p50']:>7.2f} {latency['p95']:>7.2f} {latency['p99']:>7.2f}",
+            flush=True
+        )
+
+    knee = find_knee(stages)
+    if knee is None:
+        print("\nThroughput kept scaling over the whole ramp")
+    else:
+        print(f"\nThroughput stops scaling beyond {knee} concurrent users")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"mix": dict(zip(KINDS, mix)), "repeat_share": args.repeat_share, "think_s": args.think, "knee_users": knee, "stages": stages}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
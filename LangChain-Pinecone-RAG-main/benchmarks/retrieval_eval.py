@@ -0,0 +1,188 @@
+"""
+Retrieval quality and latency across backends, chunkers, k and score thresholds.
+
+Each labelled query lists the passages that answer it as {source, contains}: a
+retrieved chunk is relevant if it comes from that source and contains that text,
+so the labels hold for any chunking. Documents are selected exactly as the agents
+do (strict threshold, then the 0.3 fallback, then plain similarity).
+
+Reported per configuration: recall@k (share of labelled passages retrieved), MRR,
+the share of queries answered from the strict tier, mean context tokens, and
+embedding + search latency.
+
+Backends:
+    hash      offline HashEmbeddings + in-memory index (no downloads; a latency floor)
+    minilm    the app's all-MiniLM-L6-v2 embeddings + in-memory index
+    pinecone  the live Pinecone index as ingested (chunker fixed; needs the app's .env)
+
+Usage:
+    python benchmarks/retrieval_eval.py [--backends hash,minilm] [--chunkers 1000:200,500:100]
+        [--k 3,5,10] [--thresholds 0.3,0.5,0.6] [--json retrieval.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.base_agent import select_documents  # noqa: E402
+from agents.offline import HashEmbeddings, InMemoryIndex  # noqa: E402
+from agents.stats import latency_summary  # noqa: E402
+from agents.tokens import count_tokens  # noqa: E402
+from ingestion import create_travel_documents, load_pdf_documents, split_documents  # noqa: E402
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "retrieval_queries.jsonl")
+
+
+def load_labelled(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def is_relevant(doc, label):
+    metadata = getattr(doc, "metadata", {}) or {}
+    return (
+        metadata.get("source") == label["source"]
+        and _normalize(label["contains"]) in _normalize(doc.page_content)
+    )
+
+
+def build_backend(name, raw_documents, chunk_size, chunk_overlap):
+    """(embeddings, vector index, chunks or None, seconds to build)"""
+    start = time.perf_counter()
+    if name == "pinecone":
+        from pinecone import Pinecone
+        from langchain_pinecone import PineconeVectorStore
+        from langchain_huggingface import HuggingFaceEmbeddings
+        from agents.providers import PineconeIndex
+        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        index = Pinecone(api_key=os.environ.get("PINECONE_API_KEY")).Index(os.environ.get("PINECONE_INDEX_NAME"))
+        return embeddings, PineconeIndex(PineconeVectorStore(index=index, embedding=embeddings), index), None, 0.0
+
+    if name == "minilm":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    elif name == "hash":
+        embeddings = HashEmbeddings()
+    else:
+        raise SystemExit(f"Unknown backend: {name}")
+    chunks = split_documents(raw_documents, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    index = InMemoryIndex(embeddings, chunks)
+    return embeddings, index, chunks, time.perf_counter() - start
+
+
+def evaluate(embeddings, index, labelled, k_values, thresholds):
+    """One result row per (k, threshold) for an already built index"""
+    per_config = {(k, t): {"recall": [], "rr": [], "strict": [], "tokens": [], "latency": []} for k in k_values for t in thresholds}
+    embed_ms = []
+    search_ms = {k: [] for k in k_values}
+    for row in labelled:
+        start = time.perf_counter()
+        embedding = embeddings.embed_query(row["query"])
+        embed_ms.append((time.perf_counter() - start) * 1000)
+        for k in k_values:
+            start = time.perf_counter()
+            scored = index.search(embedding, k)
+            search_ms[k].append((time.perf_counter() - start) * 1000)
+            for threshold in thresholds:
+                docs, tier = select_documents(scored, threshold)
+                found = [any(is_relevant(doc, label) for doc in docs) for label in row["relevant"]]
+                first = next((rank for rank, doc in enumerate(docs, start=1) if any(is_relevant(doc, label) for label in row["relevant"])), None)
+                stats = per_config[(k, threshold)]
+                stats["recall"].append(sum(found) / len(found))
+                stats["rr"].append(1.0 / first if first else 0.0)
+                stats["strict"].append(tier == "strict")
+                stats["tokens"].append(count_tokens("\n\n".join(doc.page_content for doc in docs)))
+                stats["latency"].append(embed_ms[-1] + search_ms[k][-1])
+
+    rows = []
+    for (k, threshold), stats in per_config.items():
+        latency = latency_summary(stats["latency"])
+        rows.append({
+            "k": k,
+            "threshold": threshold,
+            "recall": statistics.mean(stats["recall"]),
+            "mrr": statistics.mean(stats["rr"]),
+            "strict_rate": statistics.mean(stats["strict"]),
+            "context_tokens": statistics.mean(stats["tokens"]),
+            "embed_ms_p50": latency_summary(embed_ms)["p50"],
+            "search_ms_p50": latency_summary(search_ms[k])["p50"],
+            "latency_ms_p50": latency["p50"],
+            "latency_ms_p95": latency["p95"],
+        })
+    return rows
+
+
+def unreachable_labels(chunks, labelled):
+    """Labelled passages no chunk contains (e.g. split across a chunk boundary)"""
+    return [
+        (row["query"], label["contains"])
+        for row in labelled for label in row["relevant"]
+        if not any(is_relevant(chunk, label) for chunk in chunks)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="JSONL file of {query, relevant: [{source, contains}]}")
+    parser.add_argument("--backends", default="hash,minilm", help="Comma-separated: hash, minilm, pinecone")
+    parser.add_argument("--chunkers", default="1000:200,500:100,2000:200", help="chunk_size:chunk_overlap pairs for split_documents")
+    parser.add_argument("--k", default="3,5,10", help="Comma-separated k values")
+    parser.add_argument("--thresholds", default="0.3,0.5,0.6,0.7", help="Comma-separated strict score thresholds")
+    parser.add_argument("--json", help="Write every result row to this file")
+    args = parser.parse_args()
+
+    labelled = load_labelled(args.data)
+    k_values = [int(k) for k in args.k.split(",")]
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+    chunkers = [tuple(int(n) for n in spec.split(":")) for spec in args.chunkers.split(",")]
+    raw_documents = load_pdf_documents() + create_travel_documents()
+
+    results = []
+    for backend in args.backends.split(","):
+        # The live index is evaluated as ingested, so chunking cannot vary
+        for chunk_size, chunk_overlap in (chunkers if backend != "pinecone" else [(None, None)]):
+            embeddings, index, chunks, build_seconds = build_backend(backend, raw_documents, chunk_size, chunk_overlap)
+            chunker = f"{chunk_size}:{chunk_overlap}" if chunk_size else "ingested"
+            if chunks is not None:
+                for query, passage in unreachable_labels(chunks, labelled):
+                    print(f"  ⚠️ {backend} {chunker}: no chunk contains {passage!r} (for {query!r})")
+            embeddings.embed_query("warm up")
+            for row in evaluate(embeddings, index, labelled, k_values, thresholds):
+                results.append({
+                    "backend": backend,
+                    "chunker": chunker,
+                    "chunks": len(chunks) if chunks is not None else None,
+                    "index_build_s": build_seconds,
+                    **row,
+                })
+
+    print(f"\n{len(labelled)} labelled queries\n")
+    header = (
+        f"{'backend':<9} {'chunker':<9} {'k':>3} {'thresh':>6} {'recall':>7} {'MRR':>6} "
+        f"{'strict':>7} {'ctx tok':>8} {'p50 ms':>7} {'p95 ms':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['backend']:<9} {r['chunker']:<9} {r['k']:>3} {r['threshold']:>6.2f} {r['recall']:>7.2%} "
+            f"{r['mrr']:>6.3f} {r['strict_rate']:>7.2%} {r['context_tokens']:>8.0f} "
+            f"{r['latency_ms_p50']:>7.2f} {r['latency_ms_p95']:>7.2f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"queries": len(labelled), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Offline comparison of keyword routing (analyze_query/select_agents) and the
+embedding intent router on a labelled query set.
+
+Queries that are also intent exemplars are left out of the evaluation, since the
+router has seen them. Queries are embedded up front and the embedding time is
+reported on its own: in the app the router reuses the query plan's embedding,
+so embedding routing latency covers only scoring. With --calibrate the threshold is chosen by k-fold
+cross-validation: each fold is routed with the threshold calibrated on the other
+folds, so no query is scored with a threshold tuned on it.
+
+Usage:
+    python benchmarks/routing_comparison.py [--data benchmarks/data/routing_queries.jsonl]
+        [--embeddings minilm|hash] [--calibrate] [--folds 5]
+
+Runs against the offline stand-ins; no API keys are needed (minilm downloads the
+embedding model on first use).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# select_agents logs every routing decision at INFO; keep the report readable
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from agents.intent_router import INTENT_EXEMPLARS, EmbeddingRouter, selection_f1  # noqa: E402
+from agents.offline import HashEmbeddings, build_offline_coordinator  # noqa: E402
+from agents.stats import latency_summary  # noqa: E402
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "routing_queries.jsonl")
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def load_labelled(path):
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["query"], row["agents"]) for row in rows]
+
+
+def without_exemplars(labelled):
+    """Labelled queries the embedding router was not built from"""
+    exemplars = {_normalize(text) for texts in INTENT_EXEMPLARS.values() for text in texts}
+    return [(query, agents) for query, agents in labelled if _normalize(query) not in exemplars]
+
+
+def build_embeddings(name):
+    if name == "hash":
+        return HashEmbeddings()
+    if name == "minilm":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    raise SystemExit(f"Unknown embeddings: {name}")
+
+
+def route_all(route, labelled):
+    """Run `route(query) -> agents` over labelled queries, one record per query"""
+    records = []
+    for query, expected in labelled:
+        start = time.perf_counter()
+        selected = route(query)
+        records.append({
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "f1": selection_f1(selected, expected),
+            "exact": set(selected) == set(expected),
+            "agents": len(selected),
+        })
+    return records
+
+
+def embed_all(router, labelled):
+    """Query embeddings, computed once like the coordinator's query plan, and the time each took"""
+    embedded, latencies = {}, []
+    for query, _ in labelled:
+        start = time.perf_counter()
+        embedded[query] = router.embed(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return embedded, latency_summary(latencies)
+
+
+def summarize(name, records):
+    latency = latency_summary(r["latency_ms"] for r in records)
+    return {
+        "router": name,
+        "exact_match": statistics.mean(r["exact"] for r in records),
+        "mean_f1": statistics.mean(r["f1"] for r in records),
+        "agents_per_query": statistics.mean(r["agents"] for r in records),
+        "latency_ms_p50": latency["p50"],
+        "latency_ms_p95": latency["p95"],
+        "latency_ms_mean": latency["mean"],
+    }
+
+
+def cross_validate(router, embedded, labelled, folds):
+    """Embedding-router records with each fold routed at the threshold calibrated on the rest"""
+    records, thresholds = [], []
+    for fold in range(folds):
+        held_out = [row for i, row in enumerate(labelled) if i % folds == fold]
+        training = [row for i, row in enumerate(labelled) if i % folds != fold]
+        if not held_out or not training:
+            continue
+        thresholds.append(router.calibrate(training))
+        records.extend(route_all(lambda q: router.route(embedded[q])[0], held_out))
+    return records, thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="JSONL file of {query, agents}")
+    parser.add_argument("--embeddings", default="minilm", help="Router embeddings: minilm (as deployed) or hash")
+    parser.add_argument("--calibrate", action="store_true", help="Cross-validate the router threshold on the data")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds for --calibrate")
+    args = parser.parse_args()
+
+    loaded = load_labelled(args.data)
+    labelled = without_exemplars(loaded)
+    if len(labelled) < len(loaded):
+        print(f"Left out {len(loaded) - len(labelled)} labelled queries that are also intent exemplars")
+
+    # Keyword routing only needs the coordinator's matcher, so no documents are loaded
+    coordinator = build_offline_coordinator(documents=[], routing_mode="keyword")
+    router = EmbeddingRouter(build_embeddings(args.embeddings))
+
+    # Warm both paths so model loading is not counted as routing latency
+    coordinator.select_agents("warm up")
+    router.route(router.embed("warm up"))
+
+    embedded, embedding_latency = embed_all(router, labelled)
+    keyword = summarize("keyword", route_all(coordinator.select_agents, labelled))
+    if args.calibrate:
+        records, thresholds = cross_validate(router, embedded, labelled, args.folds)
+        embedding = summarize("embedding", records)
+        threshold_note = (
+            f"cross-validated thresholds {min(thresholds):.2f}-{max(thresholds):.2f}; "
+            f"calibrated on all queries: {router.calibrate(labelled):.2f} (use as ROUTER_THRESHOLD)"
+        )
+    else:
+        embedding = summarize("embedding", route_all(lambda q: router.route(embedded[q])[0], labelled))
+        threshold_note = f"threshold {router.threshold:.2f}"
+    results = [keyword, embedding]
+
+    print(f"\n{len(labelled)} labelled queries, embedding router on {args.embeddings} ({threshold_note})\n")
+    header = f"{'router':<10} {'exact':>7} {'F1':>7} {'agents/q':>9} {'p50 ms':>8} {'p95 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['router']:<10} {r['exact_match']:>7.2%} {r['mean_f1']:>7.3f} {r['agents_per_query']:>9.2f} "
+            f"{r['latency_ms_p50']:>8.2f} {r['latency_ms_p95']:>8.2f}"
+        )
+    print(
+        f"\nQuery embedding (shared with retrieval, not counted above): "
+        f"p50 {embedding_latency['p50']:.2f} ms, p95 {embedding_latency['p95']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -15,27 +15,29 @@ from langchain_core.documents import Document
 load_dotenv()
 
 # -------------------- Pinecone Setup --------------------
-pc = Pinecone(api_key=os.environ.get("PINECONE_API_KEY"))
-index_name = os.environ.get("PINECONE_INDEX_NAME")
-
-existing_indexes = [idx["name"] for idx in pc.list_indexes()]
-if index_name not in existing_indexes:
-    print(f"Creating Pinecone index '{index_name}'...")
-    pc.create_index(
-        name=index_name,
-        dimension=384,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-    )
-    # Wait until ready
-    while not pc.describe_index(index_name).status["ready"]:
-        time.sleep(1)
+def get_vector_store():
+    """Connect to (creating if needed) the Pinecone index and wrap it in a vector store"""
+    pc = Pinecone(api_key=os.environ.get("PINECONE_API_KEY"))
+    index_name = os.environ.get("PINECONE_INDEX_NAME")
+
+    existing_indexes = [idx["name"] for idx in pc.list_indexes()]
+    if index_name not in existing_indexes:
+        print(f"Creating Pinecone index '{index_name}'...")
+        pc.create_index(
+            name=index_name,
+            dimension=384,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+        )
+        # Wait until ready
+        while not pc.describe_index(index_name).status["ready"]:
+            time.sleep(1)
 
-index = pc.Index(index_name)
+    index = pc.Index(index_name)
 
-# -------------------- Embeddings --------------------
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-vector_store = PineconeVectorStore(index=index, embedding=embeddings)
+    # -------------------- Embeddings --------------------
+    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    return PineconeVectorStore(index=index, embedding=embeddings), index_name
 
 # -------------------- Create Comprehensive Travel Data --------------------
 def create_travel_documents():
@@ -138,47 +140,65 @@ def create_travel_documents():
     return documents
 
 # -------------------- Load PDFs --------------------
-documents_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "documents")
-pdf_files = [f for f in os.listdir(documents_dir) if f.endswith(".pdf")]
-
-raw_documents = []
-if pdf_files:
-    for pdf_file in pdf_files:
-        pdf_path = os.path.join(documents_dir, pdf_file)
-        print(f"Loading {pdf_file}...")
-        loader = PyPDFLoader(pdf_path)
-        docs = loader.load()
-        for d in docs:
-            d.metadata["source"] = pdf_file
-            d.metadata["type"] = "pdf_document"
-        raw_documents.extend(docs)
-    print(f"✅ Loaded {len(raw_documents)} pages from {len(pdf_files)} PDF files")
-else:
-    print("No PDF files found, using travel data only")
-
-# -------------------- Create Travel Documents --------------------
-print("🌍 Creating comprehensive travel data...")
-travel_documents = create_travel_documents()
-print(f"✅ Created {len(travel_documents)} travel guide documents")
-
-# Combine all documents
-all_documents = raw_documents + travel_documents
+DOCUMENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "documents")
+
+
+def load_pdf_documents(documents_dir=DOCUMENTS_DIR):
+    """Load every page of the bundled PDFs, tagged with its source file"""
+    pdf_files = [f for f in os.listdir(documents_dir) if f.endswith(".pdf")]
+
+    raw_documents = []
+    if pdf_files:
+        for pdf_file in pdf_files:
+            pdf_path = os.path.join(documents_dir, pdf_file)
+            print(f"Loading {pdf_file}...")
+            loader = PyPDFLoader(pdf_path)
+            docs = loader.load()
+            for d in docs:
+                d.metadata["source"] = pdf_file
+                d.metadata["type"] = "pdf_document"
+            raw_documents.extend(docs)
+        print(f"✅ Loaded {len(raw_documents)} pages from {len(pdf_files)} PDF files")
+    else:
+        print("No PDF files found, using travel data only")
+    return raw_documents
 
 # -------------------- Split Documents --------------------
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=1000,
-    chunk_overlap=200,
-    length_function=len,
-)
-documents = text_splitter.split_documents(all_documents)
-print(f"✅ Split into {len(documents)} chunks")
-
-# -------------------- Add to Pinecone --------------------
-print("📤 Adding documents to Pinecone...")
-uuids = [f"enhanced_id_{i}" for i in range(len(documents))]
-vector_store.add_documents(documents=documents, ids=uuids)
-print(f"✅ Added {len(documents)} chunks to Pinecone index '{index_name}'")
-print("🎉 Enhanced knowledge base with comprehensive travel data is ready!")
-print("🌍 Cities included: Tokyo, Paris, Rome, Bangkok, New York")
-print("📚 Categories: Culture, Activities, Food, Language")
-print("🚀 Your multi-agent system is now ready for detailed itinerary queries!")
+def split_documents(all_documents, chunk_size=1000, chunk_overlap=200):
+    """Split documents into overlapping chunks for indexing"""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+    )
+    return text_splitter.split_documents(all_documents)
+
+
+def main():
+    vector_store, index_name = get_vector_store()
+    raw_documents = load_pdf_documents()
+
+    # -------------------- Create Travel Documents --------------------
+    print("🌍 Creating comprehensive travel data...")
+    travel_documents = create_travel_documents()
+    print(f"✅ Created {len(travel_documents)} travel guide documents")
+
+    # Combine all documents
+    all_documents = raw_documents + travel_documents
+
+    documents = split_documents(all_documents)
+    print(f"✅ Split into {len(documents)} chunks")
+
+    # -------------------- Add to Pinecone --------------------
+    print("📤 Adding documents to Pinecone...")
+    uuids = [f"enhanced_id_{i}" for i in range(len(documents))]
+    vector_store.add_documents(documents=documents, ids=uuids)
+    print(f"✅ Added {len(documents)} chunks to Pinecone index '{index_name}'")
+    print("🎉 Enhanced knowledge base with comprehensive travel data is ready!")
+    print("🌍 Cities included: Tokyo, Paris, Rome, Bangkok, New York")
+    print("📚 Categories: Culture, Activities, Food, Language")
+    print("🚀 Your multi-agent system is now ready for detailed itinerary queries!")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,11 @@ Multi-Agent Travel Guide - Unified Streamlit Interface
 """
 
 import os
+import uuid
 import streamlit as st
 from dotenv import load_dotenv
 from agents import AgentCoordinator
+from agents.usage import add_usage, empty_usage
 
 load_dotenv()
 
@@ -784,6 +786,12 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 if "coordinator" not in st.session_state:
     st.session_state.coordinator = None
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+if "usage" not in st.session_state:
+    st.session_state.usage = dict(empty_usage(), requests=0)
+if "profile_mode" not in st.session_state:
+    st.session_state.profile_mode = "Off"
 
 # ---------------- Modern Hero Section ----------------
 st.markdown("""
@@ -825,6 +833,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------------- Modern Sidebar ----------------
+session_usage_placeholder = None
 with st.sidebar:
     st.markdown("## 🤖 AI Agent Capabilities")
     
@@ -841,6 +850,37 @@ with st.sidebar:
                 for capability in capabilities_list:
                     st.markdown(f"<li>{capability}</li>", unsafe_allow_html=True)
                 st.markdown("</ul></div>", unsafe_allow_html=True)
+        
+        # Cache effectiveness across all sessions sharing this coordinator
+        with st.expander("⚡ Performance", expanded=False):
+            for cache_name, stats in st.session_state.coordinator.get_cache_stats().items():
+                st.markdown(
+                    f"**{cache_name.replace('_', ' ').title()} cache:** "
+                    f"{stats['hit_rate']:.0%} hit rate ({stats['hits']} hits / {stats['misses']} misses)"
+                )
+            for service, stats in st.session_state.coordinator.get_circuit_stats().items():
+                st.markdown(
+                    f"**{service.replace('_', ' ').title()} circuit:** {stats['state'].replace('_', '-')} "
+                    f"({stats['failures']} failures, {stats['rejected']} skipped)"
+                )
+            for tier, stats in st.session_state.coordinator.get_tier_stats().items():
+                st.markdown(
+                    f"**{tier.title()} model** ({stats['model']}): {stats['calls']} calls, "
+                    f"{stats['avg_latency']:.1f}s avg, "
+                    f"{stats['input_tokens'] + stats['output_tokens']:,} tokens"
+                )
+            # Profile this session's next requests (PROFILE_REQUESTS profiles every request)
+            st.selectbox(
+                "🔬 Profile requests",
+                ["Off", "cprofile", "sample"],
+                key="profile_mode",
+                help="cprofile counts every call; sample is cheaper and shows where wall-clock time goes"
+            )
+            all_sessions_cost = sum(stats["cost_usd"] for stats in st.session_state.coordinator.get_tier_stats().values())
+            st.markdown(f"**LLM cost, all sessions:** ${all_sessions_cost:.4f}")
+        
+        # Filled in after this run's request so the totals include it
+        session_usage_placeholder = st.empty()
     
     st.markdown("---")
     st.markdown("""
@@ -941,7 +981,12 @@ if prompt := st.chat_input("🌍 Ask about travel destinations, activities, food
             """, unsafe_allow_html=True)
         
         try:
-            result = st.session_state.coordinator.coordinate_response(prompt)
+            profile_mode = st.session_state.profile_mode
+            result = st.session_state.coordinator.coordinate_response(
+                prompt,
+                profile=None if profile_mode == "Off" else profile_mode,
+                session_id=st.session_state.session_id
+            )
             
             # Clear loading animation
             loading_placeholder.empty()
@@ -955,6 +1000,45 @@ if prompt := st.chat_input("🌍 Ask about travel destinations, activities, food
                 agents_html += f'<span class="agent-indicator {agent.lower()}">{agent}</span>'
             st.markdown(f"<div style='margin-top: 0.75rem;'>{agents_html}</div>", unsafe_allow_html=True)
             
+            # Note agents that missed their share of the latency budget
+            if result.get("timed_out_agents"):
+                st.caption(f"⏱️ Partial answer: {', '.join(result['timed_out_agents'])} agent(s) ran out of time and gave general guidance instead.")
+
+            # Where the time went, stage by stage
+            if result.get("trace"):
+                with st.expander("⏱️ Stage Timings"):
+                    depth = {}
+                    for trace_span in result["trace"]:
+                        depth[trace_span["id"]] = depth.get(trace_span["parent"], -1) + 1
+                        indent = "&nbsp;" * 4 * depth[trace_span["id"]]
+                        st.markdown(
+                            f"{indent}`{trace_span['name']}` starts {trace_span['start_ms']:.0f} ms, "
+                            f"takes **{trace_span['duration_ms']:.0f} ms**",
+                            unsafe_allow_html=True
+                        )
+
+            # Tokens and cost of this answer (a shared or cached answer made no new calls)
+            usage = result["usage"]
+            if usage["llm_calls"] and not result.get("coalesced"):
+                st.caption(
+                    f"🪙 {usage['input_tokens']:,} prompt + {usage['output_tokens']:,} completion tokens "
+                    f"in {usage['llm_calls']} LLM call(s) · ${usage['cost_usd']:.4f}"
+                )
+            add_usage(st.session_state.usage, empty_usage() if result.get("coalesced") else usage)
+
+            # Hottest functions when this request was profiled
+            if result.get("profile"):
+                profile = result["profile"]
+                with st.expander(f"🔬 Profile ({profile['mode']}, {profile['duration_s']:.2f}s)"):
+                    for row in profile["top"]:
+                        count = f"{row['calls']} calls" if "calls" in row else f"{row['samples']} samples"
+                        st.markdown(
+                            f"`{row['function']}` — **{row['self_s'] * 1000:.1f} ms** self, "
+                            f"{row['cumulative_s'] * 1000:.1f} ms cumulative ({count})"
+                        )
+                    if profile.get("file"):
+                        st.caption(f"Full profile: {profile['file']}")
+
             # Show sources if available
             if result["sources"]:
                 with st.expander("📚 Sources & References"):
@@ -1004,6 +1088,22 @@ if prompt := st.chat_input("🌍 Ask about travel destinations, activities, food
                 "content": "I'm sorry, I encountered an error while processing your request. Please try again."
             })
 
+# Token and cost totals for this session, per agent
+if session_usage_placeholder is not None and st.session_state.usage["requests"]:
+    session_usage = st.session_state.usage
+    with session_usage_placeholder.container():
+        with st.expander("🪙 Session Usage", expanded=False):
+            st.markdown(
+                f"**{session_usage['requests']} requests:** {session_usage['llm_calls']} LLM calls, "
+                f"{session_usage['input_tokens']:,} prompt + {session_usage['output_tokens']:,} completion tokens, "
+                f"${session_usage['cost_usd']:.4f}"
+            )
+            for agent, agent_usage in sorted(session_usage["by_agent"].items(), key=lambda item: -item[1]["cost_usd"]):
+                st.markdown(
+                    f"**{agent}:** {agent_usage['llm_calls']} calls, "
+                    f"{agent_usage['input_tokens'] + agent_usage['output_tokens']:,} tokens, ${agent_usage['cost_usd']:.4f}"
+                )
+
 # ---------------- Modern Footer ----------------
 st.markdown("""
 <div class="footer-container">
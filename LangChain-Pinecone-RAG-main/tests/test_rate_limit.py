@@ -0,0 +1,10 @@
+from agents.rate_limit import TokenBucket
+
+
+def test_refund_of_oversized_reservation_returns_only_what_was_taken():
+    bucket = TokenBucket(rate=1.0, capacity=100)
+    bucket.reserve(60)
+    bucket.reserve(500)
+    bucket.refund(500)
+    # Only the 100 taken for the oversized request comes back; the first 60 stay reserved
+    assert 40 <= bucket._level <= 41
@@ -0,0 +1,31 @@
+from agents.query_plan import QueryPlan
+from agents.speculation import RetrievalMissTracker, names_place
+
+
+def plan_for(query, destination):
+    return QueryPlan(query=query, sanitized_query=query, selected_agents=["language"], is_itinerary=False, destination=destination)
+
+
+def test_query_without_destination_does_not_speculate():
+    tracker = RetrievalMissTracker()
+    # What BaseAgent.extract_destination falls back to when a query names no place
+    for query, word in [
+        ("How do I say thank you?", "How"),
+        ("What are the must-try local dishes?", "What"),
+        ("Tell me about wedding customs", "Tell"),
+    ]:
+        assert not names_place(word, query)
+        assert not tracker.predict_miss(plan_for(query, word))
+
+
+def test_query_without_destination_follows_miss_rate():
+    tracker = RetrievalMissTracker()
+    for _ in range(10):
+        tracker.record_retrieval(missed=True)
+    assert tracker.predict_miss(plan_for("How do I say thank you?", "How"))
+
+
+def test_place_outside_corpus_speculates():
+    tracker = RetrievalMissTracker()
+    assert tracker.predict_miss(plan_for("Tell me about wedding customs in Morocco", "Morocco"))
+    assert not tracker.predict_miss(plan_for("Where can I eat pho in Hanoi?", "Hanoi"))